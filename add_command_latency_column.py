@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Add latency_ms column to command_logs and command_logs_archive tables on remote DB."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for table in ("command_logs", "command_logs_archive"):
+            try:
+                await cur.execute(f"ALTER TABLE {table} ADD COLUMN latency_ms INT NULL AFTER args")
+                print(f"✅ Added latency_ms column to {table}")
+            except Exception as e:
+                if "Duplicate column" in str(e):
+                    print(f"⚠️ Column already exists on {table}")
+                else:
+                    print(f"❌ Error on {table}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Add composite indexes for hot ticket, scheduled embed and command log queries on remote DB."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+INDEXES = [
+    ("idx_tickets_creator_status_category", "tickets", "creator_id, status, category"),
+    ("idx_tickets_status_reminded", "tickets", "status, reminded_24h"),
+    ("idx_scheduled_status_time", "scheduled_embeds", "status, schedule_for"),
+    ("idx_scheduled_user_status", "scheduled_embeds", "user_id, status"),
+    ("idx_command_logs_timestamp", "command_logs", "timestamp"),
+    ("idx_command_logs_guild_timestamp", "command_logs", "guild_id, timestamp"),
+]
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for name, table, columns in INDEXES:
+            try:
+                await cur.execute(f"CREATE INDEX {name} ON {table}({columns})")
+                print(f"✅ Added {name} on {table}({columns})")
+            except Exception as e:
+                if "Duplicate key name" in str(e):
+                    print(f"⚠️ {name} already exists")
+                else:
+                    print(f"❌ Error adding {name}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Add ticket dashboard message columns to guild_settings on remote DB."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+STATEMENTS = [
+    ("guild_settings.ticket_dashboard_channel_id", "ALTER TABLE guild_settings ADD COLUMN ticket_dashboard_channel_id BIGINT NULL"),
+    ("guild_settings.ticket_dashboard_message_id", "ALTER TABLE guild_settings ADD COLUMN ticket_dashboard_message_id BIGINT NULL"),
+]
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for name, statement in STATEMENTS:
+            try:
+                await cur.execute(statement)
+                print(f"✅ Added {name}")
+            except Exception as e:
+                if "Duplicate" in str(e):
+                    print(f"⚠️ {name} already exists")
+                else:
+                    print(f"❌ Error adding {name}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
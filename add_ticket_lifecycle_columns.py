@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Add claimed_at/first_staff_reply_at columns and a closed_at index to tickets on remote DB."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+STATEMENTS = [
+    ("tickets.claimed_at", "ALTER TABLE tickets ADD COLUMN claimed_at DATETIME NULL AFTER channel_name"),
+    ("tickets.first_staff_reply_at", "ALTER TABLE tickets ADD COLUMN first_staff_reply_at DATETIME NULL AFTER claimed_at"),
+    ("idx_tickets_closed_at", "CREATE INDEX idx_tickets_closed_at ON tickets (closed_at)"),
+]
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for name, statement in STATEMENTS:
+            try:
+                await cur.execute(statement)
+                print(f"✅ Added {name}")
+            except Exception as e:
+                if "Duplicate" in str(e):
+                    print(f"⚠️ {name} already exists")
+                else:
+                    print(f"❌ Error adding {name}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
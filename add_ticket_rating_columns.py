@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Add rating columns to tickets and ticket_ratings on remote DB (handler_rating_stats is created by the schema)."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+STATEMENTS = [
+    ("tickets.rated_at", "ALTER TABLE tickets ADD COLUMN rated_at DATETIME NULL AFTER closed_at"),
+    ("ticket_ratings.channel_id", "ALTER TABLE ticket_ratings ADD COLUMN channel_id BIGINT NULL"),
+    ("ticket_ratings.guild_id", "ALTER TABLE ticket_ratings ADD COLUMN guild_id BIGINT NULL"),
+    ("ticket_ratings.handler_id", "ALTER TABLE ticket_ratings ADD COLUMN handler_id BIGINT NULL"),
+]
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for name, statement in STATEMENTS:
+            try:
+                await cur.execute(statement)
+                print(f"✅ Added {name}")
+            except Exception as e:
+                if "Duplicate" in str(e):
+                    print(f"⚠️ {name} already exists")
+                else:
+                    print(f"❌ Error adding {name}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Add channel_name/closed_at to tickets and a FULLTEXT index on ticket_messages on remote DB."""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+STATEMENTS = [
+    ("tickets.channel_name", "ALTER TABLE tickets ADD COLUMN channel_name VARCHAR(100) NULL"),
+    ("tickets.closed_at", "ALTER TABLE tickets ADD COLUMN closed_at DATETIME NULL"),
+    ("ft_ticket_messages_content", "ALTER TABLE ticket_messages ADD FULLTEXT INDEX ft_ticket_messages_content (content)"),
+]
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+    )
+    
+    async with conn.cursor() as cur:
+        for name, statement in STATEMENTS:
+            try:
+                await cur.execute(statement)
+                print(f"✅ Added {name}")
+            except Exception as e:
+                if "Duplicate" in str(e):
+                    print(f"⚠️ {name} already exists")
+                else:
+                    print(f"❌ Error adding {name}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Mark already-overdue open tickets as escalated on remote DB before deploying the deadline heap.
+
+The old reminder loop never set escalated_48h, so without this every unclaimed ticket
+older than 48h would get a role ping the moment the new TicketDeadlines loads. Only
+tickets past the 48h mark are touched; running the script twice is harmless.
+"""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+        autocommit=True,
+    )
+
+    async with conn.cursor() as cur:
+        try:
+            updated = await cur.execute(
+                """UPDATE tickets SET reminded_24h = TRUE, escalated_48h = TRUE
+                   WHERE status = 'open' AND claimed_by IS NULL AND escalated_48h = FALSE
+                   AND created_at < NOW() - INTERVAL 48 HOUR"""
+            )
+            print(f"✅ Marked {updated} overdue tickets as escalated")
+        except Exception as e:
+            print(f"❌ Error backfilling escalations: {e}")
+
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Compares hot query latency between the MySQL and SQLite database backends.
+
+Run from the repo root:
+    python -m benchmarks.bench_db_backends            # both backends (MySQL from .env)
+    python -m benchmarks.bench_db_backends sqlite     # SQLite only
+
+Each backend gets a throwaway dataset seeded into its own tables, so point the
+MySQL run at a scratch database, never production.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from database.db import Database, create_backend
+
+GUILD_ID = 1000
+ITERATIONS = 500
+
+HOT_QUERIES = {
+    "team autocomplete": (
+        "SELECT team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)",
+        ("MLBB",),
+        "fetchall",
+    ),
+    "guild settings": (
+        "SELECT log_channel_id FROM guild_settings WHERE guild_id = %s",
+        (GUILD_ID,),
+        "fetchrow",
+    ),
+    "open ticket check": (
+        "SELECT channel_id FROM tickets WHERE creator_id = %s AND status = 'open' AND category = %s",
+        (42, "A"),
+        "fetchrow",
+    ),
+    "verification status": (
+        """SELECT t.game_name, t.team_name, pr.ign, pr.nickname_preference
+           FROM player_registrations pr
+           JOIN teams t ON pr.team_id = t.id
+           WHERE pr.discord_id = %s
+           ORDER BY t.game_name""",
+        (42,),
+        "fetchall",
+    ),
+    "command log insert": (
+        "INSERT INTO command_logs (user_id, guild_id, channel_id, command_name, args) VALUES (%s, %s, %s, %s, %s)",
+        (42, GUILD_ID, 1, "roster", "[]"),
+        "execute",
+    ),
+}
+
+
+async def seed(db):
+    await db.initialize_schema()
+    await db.execute(
+        "INSERT INTO guild_settings (guild_id, log_channel_id) VALUES (%s, %s) ON DUPLICATE KEY UPDATE log_channel_id = %s",
+        (GUILD_ID, 1, 1)
+    )
+    for i in range(200):
+        await db.execute("INSERT INTO teams (game_name, team_name) VALUES (%s, %s) ON DUPLICATE KEY UPDATE team_name = team_name", ("MLBB", f"Bench Team {i:03d}"))
+    team = await db.fetchrow("SELECT id FROM teams WHERE game_name = %s LIMIT 1", ("MLBB",))
+    await db.execute("INSERT INTO player_registrations (discord_id, team_id, ign) VALUES (%s, %s, %s)", (42, team["id"], "bench"))
+    for i in range(2000):
+        await db.execute(
+            "INSERT INTO tickets (channel_id, guild_id, creator_id, category, status) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE status = status",
+            (10_000_000 + i, GUILD_ID, i % 500, "ABCD"[i % 4], "closed" if i % 5 else "open")
+        )
+
+
+async def bench_backend(name):
+    backend = create_backend(name)
+    if name == "sqlite":
+        backend.path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = Database(backend)
+    try:
+        await db.connect()
+    except Exception as e:
+        print(f"[{name}] skipped: {e}")
+        return None
+
+    await seed(db)
+    results = {}
+    for label, (query, params, method) in HOT_QUERIES.items():
+        fn = getattr(db, method)
+        for _ in range(20):  # warm-up
+            await fn(query, params)
+        samples = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            await fn(query, params)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[label] = (statistics.median(samples), samples[int(len(samples) * 0.95)])
+    await db.close()
+    return results
+
+
+async def main():
+    names = sys.argv[1:] or ["mysql", "sqlite"]
+    all_results = {name: await bench_backend(name) for name in names}
+
+    print(f"\n{'query':<22}" + "".join(f"{n + ' p50 / p95 (ms)':>28}" for n in names))
+    for label in HOT_QUERIES:
+        row = f"{label:<22}"
+        for name in names:
+            res = all_results[name]
+            row += f"{'n/a':>28}" if not res else f"{res[label][0]:>18.3f} / {res[label][1]:<7.3f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compares dict, tuple and record row modes on a 10k-row result.
+
+Run from the repo root:
+    python -m benchmarks.bench_row_modes           # SQLite (no server needed)
+    python -m benchmarks.bench_row_modes mysql     # MySQL from .env (use a scratch DB)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from database.db import Database, create_backend, ROWS_DICT, ROWS_TUPLE, ROWS_RECORD
+
+ROWS = 10_000
+ROUNDS = 20
+QUERY = "SELECT id, game_name, team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)"
+
+
+async def seed(db):
+    await db.initialize_schema()
+    await db.execute("DELETE FROM teams WHERE game_name = %s", ("BENCH",))
+    for i in range(ROWS):
+        await db.execute("INSERT INTO teams (game_name, team_name) VALUES (%s, %s)", ("BENCH", f"Row Mode Team {i:05d}"))
+
+
+async def measure(db, row_mode):
+    # Time
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        rows = await db.fetchall(QUERY, ("BENCH",), row_mode=row_mode)
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+
+    # Memory held by one materialised result set
+    tracemalloc.start()
+    rows = await db.fetchall(QUERY, ("BENCH",), row_mode=row_mode)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(rows) == ROWS
+    return elapsed, current / 1024, peak / 1024
+
+
+async def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+    backend = create_backend(name)
+    if name == "sqlite":
+        backend.path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = Database(backend)
+    await db.connect()
+    await seed(db)
+
+    print(f"{ROWS} rows via {name}, mean of {ROUNDS} fetches\n")
+    print(f"{'mode':<8}{'time (ms)':>12}{'retained (KiB)':>18}{'peak (KiB)':>14}")
+    for mode in (ROWS_DICT, ROWS_TUPLE, ROWS_RECORD):
+        elapsed, retained, peak = await measure(db, mode)
+        print(f"{mode:<8}{elapsed:>12.2f}{retained:>18.0f}{peak:>14.0f}")
+
+    await db.execute("DELETE FROM teams WHERE game_name = %s", ("BENCH",))
+    await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
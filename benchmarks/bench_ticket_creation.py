@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Time-to-channel for ticket creation: old sequential pipeline vs the parallel one.
+
+Run from the repo root:
+    python -m benchmarks.bench_ticket_creation            # 100 tickets, 10 submitting at once
+    python -m benchmarks.bench_ticket_creation 300 20
+
+Discord REST calls are simulated with log-normal latencies (medians below); the DB
+insert goes to a throwaway SQLite file. "link" is when the user's "Ticket created"
+follow-up lands; "ready" is when the welcome message and DB row both exist too.
+"""
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+import discord
+
+from database.db import db
+from database.ticket_index import ticket_index
+from cogs.tickets import TicketModal, TicketActionsView, TicketCreationQueue, TicketTemplateCache, TicketDeadlines, TicketDashboard, TICKET_CATEGORIES
+from utils.constants import COLOR_GOLD
+
+CHANNEL_IDS = itertools.count(10_000)  # unique across runs, tickets.channel_id is UNIQUE
+
+# Median latency (seconds) of each simulated Discord call
+LATENCY = {"create_channel": 0.250, "send": 0.120, "followup": 0.100}
+
+
+def simulated(call):
+    return random.lognormvariate(0, 0.35) * LATENCY[call]
+
+
+class Fake:
+    """Attribute bag that, unlike SimpleNamespace, is hashable (used as overwrite keys)."""
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name, category=None):
+        self.id = channel_id
+        self.name = name
+        self.category = category
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, *args, **kwargs):
+        await asyncio.sleep(simulated("send"))
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.default_role = Fake(id=1)
+        self.me = Fake(id=2)
+        self.roles = {cat["role_id"]: Fake(id=cat["role_id"], mention=f"<@&{cat['role_id']}>") for cat in TICKET_CATEGORIES.values()}
+        self.category = types.SimpleNamespace(id=3, name="🎟⎮tickets")
+        self.categories = [self.category]
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        return self.category if channel_id == self.category.id else None
+
+    async def create_text_channel(self, name, category=None, overwrites=None):
+        await asyncio.sleep(simulated("create_channel"))
+        return FakeChannel(next(CHANNEL_IDS), name, category)
+
+
+def fake_interaction(guild, panel, cog, user_id, timings):
+    user = Fake(
+        id=user_id, name=f"user{user_id}", display_name=f"User {user_id}", mention=f"<@{user_id}>",
+        display_avatar=types.SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png")
+    )
+
+    async def followup_send(content, **kwargs):
+        await asyncio.sleep(simulated("followup"))
+        if content.startswith("✅"):
+            timings["link"] = time.perf_counter()
+
+    return types.SimpleNamespace(
+        guild=guild, user=user, channel=panel, channel_id=panel.id,
+        followup=types.SimpleNamespace(send=followup_send),
+        client=types.SimpleNamespace(get_cog=lambda name: cog)
+    )
+
+
+async def legacy_open_ticket(modal, interaction):
+    """The pre-parallel pipeline: resolve everything per ticket, then each step in turn."""
+    guild, user = interaction.guild, interaction.user
+    category_channel = interaction.channel.category or discord.utils.get(guild.categories, name="🎟⎮tickets")
+    await ticket_index.find(user.id, modal.category_key)
+    role_to_ping = guild.get_role(modal.category_data["role_id"])
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+        guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True)
+    }
+    if role_to_ping: overwrites[role_to_ping] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+    ticket_channel = await guild.create_text_channel(f"[{modal.category_data['tag']}]-{user.name}", category=category_channel, overwrites=overwrites)
+    await ticket_index.create(ticket_channel.id, guild.id, user.id, modal.category_key)
+    embed = discord.Embed(title=modal.category_data["label"], description="bench", color=COLOR_GOLD)
+    await ticket_channel.send(content=f"{user.mention}", embed=embed, view=TicketActionsView())
+    await interaction.followup.send(f"✅ Ticket created: {ticket_channel.mention}", ephemeral=True)
+
+
+async def run(pipeline, tickets, concurrency):
+    ticket_index.by_channel.clear()
+    ticket_index.by_creator.clear()
+    guild = FakeGuild()
+    panel = FakeChannel(5, "tickets", guild.category)
+    cog = types.SimpleNamespace(
+        creation=TicketCreationQueue(), templates=TicketTemplateCache(),
+        deadlines=TicketDeadlines(None), dashboard=TicketDashboard(None)
+    )
+    limiter = asyncio.Semaphore(concurrency)
+    links, readies = [], []
+
+    async def one(i):
+        key = "ABCD"[i % 4]
+        modal = TicketModal(key, TICKET_CATEGORIES[key])
+        modal.ticket_subject._value = "bench"
+        modal.ticket_desc._value = "bench"
+        timings = {}
+        interaction = fake_interaction(guild, panel, cog, 100_000 + i, timings)
+        async with limiter:
+            start = time.perf_counter()
+            if pipeline == "parallel":
+                await modal.open_ticket(interaction)
+            else:
+                await legacy_open_ticket(modal, interaction)
+            readies.append(time.perf_counter() - start)
+            links.append(timings["link"] - start)
+
+    await asyncio.gather(*(one(i) for i in range(tickets)))
+    cog.dashboard.stop()
+    return links, readies
+
+
+def pct(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+async def main():
+    tickets = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    random.seed(7)
+    await db.connect()
+    await db.initialize_schema()
+    try:
+        print(f"{tickets} tickets, {concurrency} concurrent submits\n")
+        print(f"{'pipeline':<12}{'link p50':>10}{'link p95':>10}{'ready p50':>11}{'ready p95':>11}  (ms)")
+        for pipeline in ("sequential", "parallel"):
+            links, readies = await run(pipeline, tickets, concurrency)
+            print(f"{pipeline:<12}{pct(links, 50):>10.0f}{pct(links, 95):>10.0f}{pct(readies, 50):>11.0f}{pct(readies, 95):>11.0f}")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
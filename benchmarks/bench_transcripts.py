@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Compares the old string-concatenation transcript renderer with the streaming one.
+
+Run from the repo root:
+    python -m benchmarks.bench_transcripts            # 5k messages
+    python -m benchmarks.bench_transcripts 20000      # custom size
+
+Also reports the worst event-loop stall while a transcript renders inline versus
+through TranscriptRenderer's worker pools (render + zip packaging).
+"""
+import asyncio
+import datetime
+import os
+import html
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from utils.constants import TZ_MANILA
+from utils.transcripts import TranscriptMessage, TranscriptRenderer, DEFAULT_AVATAR, generate_html_transcript, STYLE
+
+ROUNDS = 5
+UPLOAD_LIMIT = 10 * 1024 * 1024
+WORDS = "registration roster diamonds payout schedule match team captain screenshot <@123456789012345678> please check".split()
+
+
+def synthetic_ticket(count):
+    rng = random.Random(42)
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    users = [(f"user{i}", f"https://cdn.discordapp.com/avatars/{i}/{'a' * 32}.png", i == 0) for i in range(6)]
+    messages = []
+    for i in range(count):
+        name, avatar, bot = rng.choice(users)
+        attachments = ()
+        if rng.random() < 0.05:
+            attachments = ((f"proof{i}.png", f"https://cdn.discordapp.com/attachments/1/{i}/proof{i}.png", "image/png"),)
+        messages.append(TranscriptMessage(
+            author_name=name, avatar_url=avatar, is_bot=bot,
+            content=" ".join(rng.choices(WORDS, k=rng.randint(3, 40))),
+            attachments=attachments,
+            created_at=(start + datetime.timedelta(seconds=30 * i)).timestamp()
+        ))
+    return messages
+
+
+def legacy_transcript(messages, channel_name):
+    """Pre-streaming renderer: grows one str with += and compiles the regex per message."""
+    html_content = f"""
+    <!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Transcript - {channel_name}</title>{STYLE}</head><body>
+         <div class="header"><h1>#{channel_name}</h1><p>Transcript generated on {datetime.datetime.now(TZ_MANILA).strftime('%Y-%m-%d %H:%M:%S')} (PHT)</p></div>
+         <div class="chat-container">
+    """
+    for msg in messages:
+        avatar = msg.avatar_url or DEFAULT_AVATAR
+        username = html.escape(msg.author_name)
+        ts = datetime.datetime.fromtimestamp(msg.created_at, TZ_MANILA).strftime('%m/%d/%Y %I:%M %p')
+        content = html.escape(msg.content or "")
+        content = re.sub(r'&lt;@!?(\d+)&gt;', r'<span class="mention">@\1</span>', content)
+        attachments = ""
+        for filename, url, content_type in msg.attachments:
+            if content_type and content_type.startswith('image/'):
+                attachments += f'<div class="attachment"><a href="{url}" target="_blank"><img src="{url}"></a></div>'
+            else:
+                attachments += f'<div class="attachment"><a href="{url}" target="_blank">📄 {html.escape(filename)}</a></div>'
+        html_content += f"""
+            <div class="message-group">
+                <img class="avatar" src="{avatar}">
+                <div class="content">
+                    <div class="meta"><span class="username">{username}</span><span class="timestamp">{ts}</span></div>
+                    <div class="text">{content}</div>
+                    {attachments}
+                </div>
+            </div>"""
+    html_content += "</div></body></html>"
+    # The old close path then wrapped this str in io.StringIO and discord encoded it again
+    return html_content.encode()
+
+
+def streaming_transcript(messages, channel_name):
+    with generate_html_transcript(messages, channel_name) as out:
+        out.seek(0, 2)
+        return out.tell()
+
+
+def measure(render, messages):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        render(messages, "[a]-bench")
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+
+    tracemalloc.start()
+    render(messages, "[a]-bench")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+async def max_loop_stall(job):
+    """Runs job() while a 1ms ticker measures the longest gap between ticks."""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await job()
+    done = True
+    await task
+    return worst * 1000
+
+
+async def discard(render):
+    package = await render
+    for path, _ in package.files:
+        os.remove(path)
+
+
+async def loop_stalls(messages):
+    async def inline():
+        streaming_transcript(messages, "[a]-bench")
+
+    rows = [("inline", await max_loop_stall(inline))]
+    for kind in ("thread", "process"):
+        renderer = TranscriptRenderer(kind=kind, workers=2)
+        renderer.start()
+        await discard(renderer.render(messages[:10], "warmup", UPLOAD_LIMIT))  # spawn workers outside the measurement
+
+        async def pooled():
+            await discard(renderer.render(messages, "[a]-bench", UPLOAD_LIMIT))
+
+        rows.append((kind, await max_loop_stall(pooled)))
+        await renderer.stop()
+    return rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    messages = synthetic_ticket(count)
+    size = len(legacy_transcript(messages, "[a]-bench"))
+
+    print(f"{count} messages, {size / 1024:.0f} KiB of HTML, mean of {ROUNDS} renders\n")
+    print(f"{'renderer':<12}{'time (ms)':>12}{'peak (KiB)':>14}")
+    for name, render in (("legacy", legacy_transcript), ("streaming", streaming_transcript)):
+        elapsed, peak = measure(render, messages)
+        print(f"{name:<12}{elapsed:>12.1f}{peak:>14.0f}")
+
+    print(f"\n{'render via':<12}{'max event-loop stall (ms)':>28}")
+    for name, stall in asyncio.run(loop_stalls(messages)):
+        print(f"{name:<12}{stall:>28.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,356 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from database.db import db
+from database.db import db, ROWS_TUPLE
+from database.guild_settings import guild_settings
+import asyncio
 import logging
 import datetime
+import os
+import re
+import json
+import math
+from collections import deque, Counter, defaultdict
+from typing import Optional
+
+# Write-behind audit logging: command_logs rows are buffered and written as one
+# multi-row INSERT every AUDIT_FLUSH_SIZE records or AUDIT_FLUSH_INTERVAL seconds.
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", 50))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 5))
+AUDIT_MAX_QUEUE = int(os.getenv("AUDIT_MAX_QUEUE", 1000))
+
+# Log channel delivery: embeds are grouped per log channel and sent every LOG_FLUSH_INTERVAL
+# seconds, 10 per message. A backlog above LOG_OVERFLOW_THRESHOLD is summarised in one embed.
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 3))
+LOG_OVERFLOW_THRESHOLD = int(os.getenv("LOG_OVERFLOW_THRESHOLD", 30))
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000  # Discord's combined limit for all embeds in one message
+
+# command_logs maintenance: hourly rollups (command_usage_hourly, command_user_hourly,
+# command_latency_hourly), and retention that
+# moves (COMMAND_LOG_ARCHIVE=1) or deletes rows older than COMMAND_LOG_RETENTION_DAYS.
+COMMAND_LOG_RETENTION_DAYS = int(os.getenv("COMMAND_LOG_RETENTION_DAYS", 90))
+COMMAND_LOG_ARCHIVE = os.getenv("COMMAND_LOG_ARCHIVE", "1").lower() in ("1", "true", "yes")
+RETENTION_BATCH_SIZE = 1000
+RETENTION_MAX_BATCHES = 50  # Per run; the rest is picked up next hour
+ROLLUP_MAX_HOURS = 168  # Per run, so a first backfill doesn't block the loop for long
+
+# Latency histogram: log-scale buckets, LATENCY_BUCKETS_PER_DOUBLING per power of two (~19% wide)
+LATENCY_BUCKETS_PER_DOUBLING = 4
+
+STATS_WINDOWS = {"24h": 1, "7d": 7, "30d": 30, "90d": 90, "365d": 365}
+
+def latency_bucket(latency_ms: int) -> int:
+    return int(LATENCY_BUCKETS_PER_DOUBLING * math.log2(max(latency_ms, 1)))
+
+def bucket_upper_ms(bucket: int) -> int:
+    return math.ceil(2 ** ((bucket + 1) / LATENCY_BUCKETS_PER_DOUBLING))
+
+def histogram_percentile(histogram: dict, q: float) -> Optional[int]:
+    """Returns the upper bound (ms) of the bucket holding the q-th quantile."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return bucket_upper_ms(bucket)
+    return bucket_upper_ms(max(histogram))
+
+async def upsert_rows(table, columns, update_columns, rows):
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE that replaces update_columns."""
+    if not rows:
+        return
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    updates = ", ".join(f"{c} = VALUES({c})" for c in update_columns)
+    await db.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_placeholder] * len(rows))} ON DUPLICATE KEY UPDATE {updates}",
+        [v for row in rows for v in row]
+    )
+
+def normalize_command_options(options) -> dict:
+    """Flattens interaction options (including subcommand groups) into {snake_case_name: value}."""
+    args = {}
+    for option in options or []:
+        if option.get("type") in (1, 2):  # Subcommand / subcommand group: descend
+            args.update(normalize_command_options(option.get("options")))
+            continue
+        name = re.sub(r"[^a-z0-9]+", "_", str(option.get("name", "")).lower()).strip("_")
+        if name:
+            args[name] = option.get("value")
+    return args
+
+def floor_hour(ts) -> datetime.datetime:
+    if isinstance(ts, str):  # SQLite returns MIN/MAX over DATETIME columns as text
+        ts = datetime.datetime.fromisoformat(ts)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+async def rollup_hour(hour: datetime.datetime):
+    """Recomputes one hour of every rollup from command_logs (aggregated in SQL)."""
+    params = (hour, hour + datetime.timedelta(hours=1))
+    usage = await db.fetchall(
+        """SELECT guild_id, command_name, COUNT(*), COUNT(DISTINCT user_id) FROM command_logs
+           WHERE timestamp >= %s AND timestamp < %s AND guild_id IS NOT NULL
+           GROUP BY guild_id, command_name""",
+        params, row_mode=ROWS_TUPLE, primary=True
+    )
+    users = await db.fetchall(
+        """SELECT guild_id, command_name, user_id, COUNT(*) FROM command_logs
+           WHERE timestamp >= %s AND timestamp < %s AND guild_id IS NOT NULL
+           GROUP BY guild_id, command_name, user_id""",
+        params, row_mode=ROWS_TUPLE, primary=True
+    )
+    # Counted per exact latency in SQL, bucketed here (log2 isn't portable across backends)
+    latencies = await db.fetchall(
+        """SELECT guild_id, command_name, latency_ms, COUNT(*) FROM command_logs
+           WHERE timestamp >= %s AND timestamp < %s AND guild_id IS NOT NULL AND latency_ms IS NOT NULL
+           GROUP BY guild_id, command_name, latency_ms""",
+        params, row_mode=ROWS_TUPLE, primary=True
+    )
+    latency = Counter()  # {(guild, command, bucket): samples}
+    for guild_id, command_name, latency_ms, count in latencies:
+        latency[(guild_id, command_name, latency_bucket(latency_ms))] += count
+
+    await upsert_rows(
+        "command_usage_hourly", ("guild_id", "hour", "command_name", "invocations", "distinct_users"), ("invocations", "distinct_users"),
+        [(g, hour, cmd, count, distinct) for g, cmd, count, distinct in usage]
+    )
+    await upsert_rows(
+        "command_user_hourly", ("guild_id", "hour", "command_name", "user_id", "invocations"), ("invocations",),
+        [(g, hour, cmd, uid, count) for g, cmd, uid, count in users]
+    )
+    await upsert_rows(
+        "command_latency_hourly", ("guild_id", "hour", "command_name", "bucket", "samples"), ("samples",),
+        [(g, hour, cmd, bucket, count) for (g, cmd, bucket), count in latency.items()]
+    )
+
+async def rollup_command_usage(state=None, now=None):
+    """Brings the hourly rollups up to date and returns the state for the next run.
+
+    State is (last_id, resume_hour): every command_logs row with id <= last_id and a
+    timestamp before resume_hour is final in the rollups. Rows inserted since last_id
+    with an older timestamp (buffered, or replayed after a DB outage) pull the start
+    back to their hour, so late writes are recounted instead of missed. Each hour is an
+    idempotent upsert, so redoing one is harmless. Every read goes to the primary: a
+    watermark from one replica and aggregates from a staler one would skip rows for good.
+    """
+    now = now or datetime.datetime.now()
+    last_id, resume_hour = state or (None, None)
+    row = await db.fetchrow("SELECT MAX(id) AS max_id FROM command_logs", primary=True)
+    max_id = row['max_id'] if row else None
+    if max_id is None:
+        return state
+
+    if resume_hour is None:
+        row = await db.fetchrow("SELECT MAX(hour) AS last_hour FROM command_usage_hourly", primary=True)
+        resume_hour = row['last_hour'] if row else None
+    if resume_hour is None:
+        row = await db.fetchrow("SELECT MIN(timestamp) AS first_ts FROM command_logs", primary=True)
+        resume_hour = row['first_ts']
+    hour = floor_hour(resume_hour)
+    if last_id is not None:
+        row = await db.fetchrow("SELECT MIN(timestamp) AS first_ts FROM command_logs WHERE id > %s AND id <= %s", (last_id, max_id), primary=True)
+        if row and row['first_ts'] is not None:
+            hour = min(hour, floor_hour(row['first_ts']))
+
+    for _ in range(ROLLUP_MAX_HOURS):
+        await rollup_hour(hour)
+        next_hour = hour + datetime.timedelta(hours=1)
+        if next_hour > now:
+            break  # Current (partial) hour done; recompute it next run
+        hour = next_hour
+    return (max_id, hour)
+
+async def apply_command_log_retention(rolled_up_to, now=None):
+    """Archives/deletes expired command_logs rows in small id-bounded batches.
+    Rows at or after `rolled_up_to` (not yet final in the rollup) are never expired."""
+    if rolled_up_to is None:
+        return 0
+    now = now or datetime.datetime.now()
+    cutoff = min(now - datetime.timedelta(days=COMMAND_LOG_RETENTION_DAYS), rolled_up_to)
+
+    removed = 0
+    for _ in range(RETENTION_MAX_BATCHES):
+        ids = await db.fetchall(
+            "SELECT id FROM command_logs WHERE timestamp < %s ORDER BY timestamp LIMIT %s",
+            (cutoff, RETENTION_BATCH_SIZE)
+        )
+        if not ids:
+            break
+        max_id = max(r['id'] for r in ids)
+        if COMMAND_LOG_ARCHIVE:
+            # IGNORE: rows archived by a run whose DELETE then failed are already there
+            await db.execute(
+                """INSERT IGNORE INTO command_logs_archive (id, user_id, guild_id, channel_id, command_name, args, latency_ms, timestamp)
+                   SELECT id, user_id, guild_id, channel_id, command_name, args, latency_ms, timestamp
+                   FROM command_logs WHERE id <= %s AND timestamp < %s""",
+                (max_id, cutoff)
+            )
+        removed += await db.execute("DELETE FROM command_logs WHERE id <= %s AND timestamp < %s", (max_id, cutoff))
+        await asyncio.sleep(0.5)  # Let other queries through between batches
+    return removed
+
+class AuditLogBuffer:
+    """Bounded in-memory queue of command_logs rows, flushed in batches."""
+
+    def __init__(self, flush_size=AUDIT_FLUSH_SIZE, max_queue=AUDIT_MAX_QUEUE):
+        self.flush_size = flush_size
+        self.max_queue = max_queue
+        self.records = deque()
+        self.lock = asyncio.Lock()
+        self._flush_task = None
+        self.stats = {"flushed": 0, "dropped": 0, "batches": 0, "peak_depth": 0}
+
+    @property
+    def depth(self):
+        return len(self.records)
+
+    async def add(self, record):
+        if self.depth >= self.max_queue:
+            # Backpressure: make the producer wait for a flush before queueing more
+            await self.flush()
+            if self.depth >= self.max_queue:
+                self.records.popleft()
+                self.stats["dropped"] += 1
+                logging.warning("Audit log queue full, dropped the oldest record.")
+
+        self.records.append(record)
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], self.depth)
+        if self.depth >= self.flush_size and not self.lock.locked():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Writes every queued record in one INSERT."""
+        async with self.lock:
+            if not self.records:
+                return
+            batch = list(self.records)
+            self.records.clear()
+
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+            params = [value for record in batch for value in record]
+            try:
+                await db.execute(
+                    f"INSERT INTO command_logs (user_id, guild_id, channel_id, command_name, args, latency_ms, timestamp) VALUES {placeholders}",
+                    params,
+                    queue_on_failure=True
+                )
+                self.stats["flushed"] += len(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                self.stats["dropped"] += len(batch)
+                logging.error(f"Failed to flush {len(batch)} audit log records: {e}")
+
+class LogChannelBatcher:
+    """Collects command log embeds per log channel and delivers them in batches."""
+
+    def __init__(self, bot, overflow_threshold=LOG_OVERFLOW_THRESHOLD):
+        self.bot = bot
+        self.overflow_threshold = overflow_threshold
+        self.pending = {}  # {log_channel_id: [(command_name, user_id, embed), ...]}
+        self.stats = {"sent": 0, "messages": 0, "summarised": 0}
+
+    def add(self, channel_id, command_name, user_id, embed):
+        self.pending.setdefault(channel_id, []).append((command_name, user_id, embed))
+
+    @staticmethod
+    def _chunk(embeds):
+        """Splits embeds into messages of at most 10 embeds / 6000 characters."""
+        chunk, size = [], 0
+        for embed in embeds:
+            if chunk and (len(chunk) == EMBEDS_PER_MESSAGE or size + len(embed) > EMBED_CHARS_PER_MESSAGE):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(embed)
+            size += len(embed)
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _summary_embed(entries):
+        counts = Counter(name for name, _, _ in entries)
+        users = len({user_id for _, user_id, _ in entries})
+        lines = [f"`/{name}` × {count}" for name, count in counts.most_common(15)]
+        if len(counts) > 15:
+            lines.append(f"...and {len(counts) - 15} other commands")
+        embed = discord.Embed(
+            title=f"📦 {len(entries)} more commands executed",
+            description="\n".join(lines),
+            color=0x3498DB,
+            timestamp=datetime.datetime.now()
+        )
+        embed.set_footer(text=f"Summarised due to log backlog • {users} user(s)")
+        return embed
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        for channel_id, entries in pending.items():
+            log_channel = self.bot.get_channel(channel_id)
+            if not log_channel:
+                continue
+
+            if len(entries) > self.overflow_threshold:
+                keep = self.overflow_threshold - 1
+                embeds = [embed for _, _, embed in entries[:keep]] + [self._summary_embed(entries[keep:])]
+                self.stats["summarised"] += len(entries) - keep
+            else:
+                embeds = [embed for _, _, embed in entries]
+
+            for chunk in self._chunk(embeds):
+                try:
+                    await log_channel.send(embeds=chunk)
+                    self.stats["sent"] += len(chunk)
+                    self.stats["messages"] += 1
+                except discord.Forbidden:
+                    break # Can't send to log channel
+                except Exception as e:
+                    logging.error(f"Failed to send log embeds: {e}")
 
 class AdminLogs(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.audit_buffer = AuditLogBuffer()
+        self.log_batcher = LogChannelBatcher(bot)
+        self.rollup_state = None  # (last rolled-up id, hour the next rollup resumes from)
+        self.flush_audit_logs.start()
+        self.flush_log_channels.start()
+        self.maintain_command_logs.start()
+
+    async def cog_unload(self):
+        self.flush_audit_logs.cancel()
+        self.flush_log_channels.cancel()
+        self.maintain_command_logs.cancel()
+        await self.audit_buffer.flush()
+        await self.log_batcher.flush()
+        logging.info(f"Audit log buffer flushed on unload. Stats: {self.audit_buffer.stats}")
+
+    @tasks.loop(seconds=AUDIT_FLUSH_INTERVAL)
+    async def flush_audit_logs(self):
+        if self.audit_buffer.depth:
+            logging.debug(f"Audit log queue depth: {self.audit_buffer.depth}")
+        await self.audit_buffer.flush()
+
+    @tasks.loop(seconds=LOG_FLUSH_INTERVAL)
+    async def flush_log_channels(self):
+        await self.log_batcher.flush()
+
+    @flush_log_channels.before_loop
+    async def before_flush_log_channels(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=10)
+    async def maintain_command_logs(self):
+        try:
+            await self.audit_buffer.flush()
+            self.rollup_state = await rollup_command_usage(self.rollup_state)
+            if self.rollup_state and datetime.datetime.now().minute < 10:  # Retention once an hour
+                removed = await apply_command_log_retention(self.rollup_state[1])
+                if removed:
+                    logging.info(f"Command log retention: {'archived' if COMMAND_LOG_ARCHIVE else 'deleted'} {removed} rows.")
+        except Exception as e:
+            logging.error(f"Command log maintenance failed: {e}")
 
     @app_commands.command(name="set_log_channel", description="Set the channel for bot command logs.")
     @app_commands.describe(channel="The channel to send command logs to")
@@ -16,13 +359,8 @@ class AdminLogs(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Upsert into guild_settings
-            query = """
-                INSERT INTO guild_settings (guild_id, log_channel_id)
-                VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE log_channel_id = %s
-            """
-            await db.execute(query, (interaction.guild.id, channel.id, channel.id))
+            # Upsert into guild_settings (and the settings cache)
+            await guild_settings.set(interaction.guild.id, "log_channel_id", channel.id)
             
             await interaction.followup.send(f"✅ Command logs will now be sent to {channel.mention}.", ephemeral=True)
             
@@ -30,48 +368,104 @@ class AdminLogs(commands.Cog):
             await interaction.followup.send(f"❌ Failed to save setting: {e}", ephemeral=True)
             logging.error(f"Error setting log channel: {e}")
 
+    @app_commands.command(name="command_stats", description="Show command usage, top users and latency.")
+    @app_commands.describe(window="Time window", command="Only show this command (optional)")
+    @app_commands.choices(window=[app_commands.Choice(name=w, value=w) for w in STATS_WINDOWS])
+    @app_commands.checks.has_permissions(administrator=True)
+    async def command_stats(self, interaction: discord.Interaction, window: str = "7d", command: Optional[str] = None):
+        await interaction.response.defer(ephemeral=True)
+        guild_id = interaction.guild.id
+        since = floor_hour(datetime.datetime.now() - datetime.timedelta(days=STATS_WINDOWS[window]))
+        command = command.lstrip("/") if command else None
+
+        # Everything below reads the hourly rollups only (refreshed every 10 minutes)
+        usage = await db.fetchall(
+            """SELECT command_name, SUM(invocations) AS invocations FROM command_usage_hourly
+               WHERE guild_id = %s AND hour >= %s GROUP BY command_name""",
+            (guild_id, since),
+            row_mode=ROWS_TUPLE
+        )
+        latency_rows = await db.fetchall(
+            """SELECT command_name, bucket, SUM(samples) AS samples FROM command_latency_hourly
+               WHERE guild_id = %s AND hour >= %s GROUP BY command_name, bucket""",
+            (guild_id, since),
+            row_mode=ROWS_TUPLE
+        )
+        if command:
+            top_users = await db.fetchall(
+                """SELECT user_id, SUM(invocations) AS invocations FROM command_user_hourly
+                   WHERE guild_id = %s AND hour >= %s AND command_name = %s GROUP BY user_id ORDER BY invocations DESC LIMIT 5""",
+                (guild_id, since, command),
+                row_mode=ROWS_TUPLE
+            )
+        else:
+            top_users = await db.fetchall(
+                """SELECT user_id, SUM(invocations) AS invocations FROM command_user_hourly
+                   WHERE guild_id = %s AND hour >= %s GROUP BY user_id ORDER BY invocations DESC LIMIT 5""",
+                (guild_id, since),
+                row_mode=ROWS_TUPLE
+            )
+
+        histograms = defaultdict(dict)
+        for name, bucket, samples in latency_rows:
+            histograms[name][bucket] = int(samples)
+
+        counts = sorted(((name, int(total)) for name, total in usage if not command or name == command), key=lambda r: r[1], reverse=True)
+        if not counts:
+            await interaction.followup.send(f"❌ No command usage recorded in the last {window}.", ephemeral=True)
+            return
+
+        def fmt(ms):
+            return "—" if ms is None else f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms}ms"
+
+        lines = []
+        for name, total in counts[:15]:
+            hist = histograms.get(name, {})
+            p50, p90, p99 = (histogram_percentile(hist, q) for q in (0.5, 0.9, 0.99))
+            lines.append(f"`/{name}` — **{total}** • p50 {fmt(p50)} • p90 {fmt(p90)} • p99 {fmt(p99)}")
+        if len(counts) > 15:
+            lines.append(f"...and {len(counts) - 15} more commands")
+
+        embed = discord.Embed(title=f"📊 Command Stats ({window})", description="\n".join(lines), color=0x3498DB)
+        if top_users:
+            embed.add_field(name=f"Top Users (/{command})" if command else "Top Users", value="\n".join(f"<@{uid}> — {int(total)}" for uid, total in top_users), inline=False)
+        embed.set_footer(text=f"{sum(total for _, total in counts)} invocations • latency is time from invocation to completion")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @commands.Cog.listener()
     async def on_app_command_completion(self, interaction: discord.Interaction, command: app_commands.Command):
         """Logs every successful slash command execution."""
         try:
-            # 1. Log to Database (Audit Trail)
-            args_str = str(interaction.data.get('options', ''))
+            # 1. Queue for the Database (Audit Trail, written in batches)
+            args_str = json.dumps(normalize_command_options(interaction.data.get('options')), ensure_ascii=False)
+            latency_ms = int((discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000)
             
-            log_query = """
-                INSERT INTO command_logs (user_id, guild_id, channel_id, command_name, args)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            await db.execute(log_query, (
+            await self.audit_buffer.add((
                 interaction.user.id,
                 interaction.guild.id,
                 interaction.channel_id,
                 command.name,
-                args_str
+                args_str,
+                latency_ms,
+                datetime.datetime.now()
             ))
 
             # 2. Log to Discord Channel (if configured)
-            settings_query = "SELECT log_channel_id FROM guild_settings WHERE guild_id = %s"
-            row = await db.fetchrow(settings_query, (interaction.guild.id,))
+            settings = await guild_settings.get(interaction.guild.id)
             
-            if row and row['log_channel_id']:
-                log_channel = interaction.guild.get_channel(row['log_channel_id'])
-                if log_channel:
-                    embed = discord.Embed(
-                        title="🤖 Command Executed",
-                        description=f"**Command:** `/{command.name}`",
-                        color=0x3498DB,
-                        timestamp=datetime.datetime.now()
-                    )
-                    embed.set_author(name=f"{interaction.user} ({interaction.user.id})", icon_url=interaction.user.display_avatar.url)
-                    embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
-                    embed.add_field(name="Args", value=f"```{args_str}```", inline=False)
-                    
-                    try:
-                        await log_channel.send(embed=embed)
-                    except discord.Forbidden:
-                        pass # Can't send to log channel
-                    except Exception as e:
-                        logging.error(f"Failed to send log embed: {e}")
+            if settings.log_channel_id:
+                embed = discord.Embed(
+                    title="🤖 Command Executed",
+                    description=f"**Command:** `/{command.name}`",
+                    color=0x3498DB,
+                    timestamp=datetime.datetime.now()
+                )
+                embed.set_author(name=f"{interaction.user} ({interaction.user.id})", icon_url=interaction.user.display_avatar.url)
+                embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
+                embed.add_field(name="Args", value=f"```{args_str[:1000]}```", inline=False)
+
+                # Delivered in batches by flush_log_channels
+                self.log_batcher.add(settings.log_channel_id, command.name, interaction.user.id, embed)
 
         except Exception as e:
             logging.error(f"Error in on_app_command_completion: {e}")
@@ -11,6 +11,7 @@ from urllib.parse import urlparse, parse_qs, quote
 from io import BytesIO
 import logging
 from database.db import db
+from database.guild_settings import guild_settings
 from utils.constants import TZ_MANILA
 from utils.views import CancelScheduledEmbedView
 
@@ -51,7 +52,7 @@ class Embeds(commands.Cog):
     async def schedule_loop(self):
         # Fetch pending tasks due now (or in past)
         query = "SELECT identifier, channel_id, user_id, content, embed_json FROM scheduled_embeds WHERE status = 'pending' AND schedule_for <= NOW()"
-        rows = await db.fetchall(query)
+        rows = await db.fetchall(query, primary=True)  # A lagging replica could resend already-sent embeds
         
         for row in rows:
             try:
@@ -67,12 +68,12 @@ class Embeds(commands.Cog):
                 await channel.send(content=content, embeds=embeds, view=view)
                 
                 # Mark sent
-                await db.execute("UPDATE scheduled_embeds SET status = 'sent' WHERE identifier = %s", (row['identifier'],))
+                await db.execute("UPDATE scheduled_embeds SET status = 'sent' WHERE identifier = %s", (row['identifier'],), queue_on_failure=True)
                 
                 # Log success
-                log_row = await db.fetchrow("SELECT embed_log_channel_id FROM guild_settings WHERE guild_id = %s", (channel.guild.id,))
-                if log_row and log_row['embed_log_channel_id']:
-                    log_channel = self.bot.get_channel(log_row['embed_log_channel_id'])
+                settings = await guild_settings.get(channel.guild.id)
+                if settings.embed_log_channel_id:
+                    log_channel = self.bot.get_channel(settings.embed_log_channel_id)
                     if log_channel:
                          embed = discord.Embed(title="✅ Scheduled Embed Sent", color=0x00FF00, timestamp=datetime.datetime.now(TZ_MANILA))
                          embed.add_field(name="Identifier", value=row['identifier'])
@@ -89,9 +90,9 @@ class Embeds(commands.Cog):
                      # Need to fetch guild ID from channel if possible, or skip
                     channel = self.bot.get_channel(row['channel_id']) or await self.bot.fetch_channel(row['channel_id'])
                     if channel:
-                        log_row = await db.fetchrow("SELECT embed_log_channel_id FROM guild_settings WHERE guild_id = %s", (channel.guild.id,))
-                        if log_row and log_row['embed_log_channel_id']:
-                            log_channel = self.bot.get_channel(log_row['embed_log_channel_id'])
+                        settings = await guild_settings.get(channel.guild.id)
+                        if settings.embed_log_channel_id:
+                            log_channel = self.bot.get_channel(settings.embed_log_channel_id)
                             if log_channel:
                                 embed = discord.Embed(title="❌ Scheduled Embed Failed", color=0xFF0000, timestamp=datetime.datetime.now(TZ_MANILA))
                                 embed.add_field(name="Identifier", value=row['identifier'])
@@ -169,10 +170,7 @@ class Embeds(commands.Cog):
     async def set_embed_log_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         await interaction.response.defer(ephemeral=True)
         try:
-            await db.execute(
-                "INSERT INTO guild_settings (guild_id, embed_log_channel_id) VALUES (%s, %s) ON DUPLICATE KEY UPDATE embed_log_channel_id = %s",
-                (interaction.guild.id, channel.id, channel.id)
-            )
+            await guild_settings.set(interaction.guild.id, "embed_log_channel_id", channel.id)
             await interaction.followup.send(f"✅ Scheduled embed logs will be sent to {channel.mention}.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Error saving setting: {e}", ephemeral=True)
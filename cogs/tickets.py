@@ -2,14 +2,23 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
-import io
+import contextlib
+import heapq
+import time
+import os
 import datetime
 import pytz
-import html
+import json
+from typing import Optional
 import re
-from database.db import db
+from database.db import db, ROWS_TUPLE
+from database.guild_settings import guild_settings
+from database.ticket_index import ticket_index, OpenTicket
 import logging
 from utils.constants import TZ_MANILA, COLOR_GOLD, COLOR_ERROR, COLOR_SUCCESS
+from utils.attachment_store import attachment_store
+from utils.quantiles import QuantileSketch
+from utils.transcripts import TranscriptMessage, TranscriptRenderer, DEFAULT_AVATAR, size_report
 
 # --- Configuration & Constants ---
 # These should ideally be in env or DB config, but hardcoded per reference for now
@@ -29,64 +38,718 @@ TICKET_CATEGORIES = {
     "D": {"label": "General & Tech Support", "desc": "Server Assistance, Bug Reports, Inquiries", "emoji": "🛠️", "tag": "d", "role_id": ROLE_OTHERS}
 }
 
-# --- HTML Transcript Generator (Ported from reference) ---
-def generate_html_transcript(messages: list[discord.Message], channel_name: str) -> str:
-    """Generates a beautiful HTML transcript of the chat history."""
-    style = """
-    <style>
-        body { font-family: 'gg sans', 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #313338; color: #dbdee1; margin: 0; padding: 20px; }
-        .header { border-bottom: 1px solid #3f4147; padding-bottom: 10px; margin-bottom: 20px; }
-        .header h1 { color: #f2f3f5; margin: 0; font-size: 20px; }
-        .chat-container { display: block; width: 100%; }
-        .message-group { display: flex; margin-bottom: 16px; align-items: flex-start; width: 100%; }
-        .avatar { width: 40px; height: 40px; border-radius: 50%; margin-right: 16px; flex-shrink: 0; background-color: #2b2d31; }
-        .content { flex: 1; }
-        .meta { display: flex; align-items: baseline; margin-bottom: 4px; }
-        .username { font-weight: 500; color: #f2f3f5; margin-right: 8px; font-size: 16px; }
-        .bot-tag { background-color: #5865f2; color: #fff; font-size: 10px; padding: 1px 4px; border-radius: 3px; vertical-align: middle; margin-left: 4px; }
-        .timestamp { font-size: 12px; color: #949ba4; }
-        .text { font-size: 16px; line-height: 1.375rem; white-space: pre-wrap; word-wrap: break-word; color: #dbdee1; }
-        .text strong { font-weight: 700; color: #f2f3f5; }
-        .text .mention { background-color: #3c4270; color: #c9cdfb; padding: 0 2px; border-radius: 3px; cursor: pointer; font-weight: 500;}
-        .attachment img { max-width: 400px; max-height: 300px; border-radius: 4px; }
-        a { color: #00a8fc; text-decoration: none; }
-    </style>
+def local_naive(dt: datetime.datetime) -> datetime.datetime:
+    """Aware datetime -> naive server local time, the convention of every DATETIME column here."""
+    return dt.astimezone().replace(tzinfo=None)
+
+# --- Ticket Message Store ---
+# Messages in open ticket channels are captured as they arrive (Tickets.on_message) so
+# closing a ticket renders the transcript from local rows instead of paging channel.history.
+# Gaps (tickets open before capture, messages sent while offline) are backfilled from
+# history at startup and again at close, so only the missing ranges are fetched.
+async def store_ticket_message(msg: discord.Message):
+    record = TranscriptMessage.from_message(msg)
+    await db.execute(
+        """INSERT INTO ticket_messages (message_id, channel_id, author_id, author_name, avatar_url, is_bot, content, attachments, created_at)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE message_id = message_id""",
+        (msg.id, msg.channel.id, msg.author.id, record.author_name[:100], record.avatar_url[:255], record.is_bot,
+         record.content, json.dumps(record.attachments), local_naive(msg.created_at)),
+        queue_on_failure=True
+    )
+
+async def update_ticket_message(msg: discord.Message):
+    # Content only: attachments removed by an edit stay in the transcript (and archive)
+    await db.execute(
+        "UPDATE ticket_messages SET content = %s, edited_at = %s WHERE message_id = %s",
+        (msg.content or "", local_naive(msg.edited_at or discord.utils.utcnow()), msg.id),
+        queue_on_failure=True
+    )
+
+async def archive_ticket_attachments(msg: discord.Message):
+    """Copies a message's attachments into the local store and records their keys on the row."""
+    keys = await attachment_store.archive_many(msg.attachments)
+    if any(keys):
+        entries = [(a.filename, a.url, a.content_type, key) for a, key in zip(msg.attachments, keys)]
+        await db.execute(
+            "UPDATE ticket_messages SET attachments = %s WHERE message_id = %s",
+            (json.dumps(entries), msg.id), queue_on_failure=True
+        )
+
+async def captured_range(channel_id: int) -> tuple[Optional[int], Optional[int]]:
+    """First and last captured message ids of a ticket (None, None if nothing was captured)."""
+    row = await db.fetchrow(
+        "SELECT MIN(message_id) AS first_id, MAX(message_id) AS last_id FROM ticket_messages WHERE channel_id = %s",
+        (channel_id,), primary=True
+    )
+    return (row['first_id'], row['last_id']) if row else (None, None)
+
+async def load_ticket_messages(channel_id: int) -> list[TranscriptMessage]:
+    rows = await db.fetchall(
+        """SELECT author_name, avatar_url, is_bot, content, attachments, created_at
+           FROM ticket_messages WHERE channel_id = %s ORDER BY created_at, message_id""",
+        (channel_id,), primary=True  # read our own capture/backfill writes, not a lagging replica
+    )
+    return [
+        TranscriptMessage(
+            author_name=r['author_name'] or "Unknown",
+            avatar_url=r['avatar_url'] or DEFAULT_AVATAR,
+            is_bot=bool(r['is_bot']),
+            content=r['content'] or "",
+            attachments=tuple(attachment_store.resolve(a) for a in json.loads(r['attachments'] or "[]")),
+            created_at=r['created_at'].timestamp()  # naive local
+        )
+        for r in rows
+    ]
+
+# --- Ticket Deadlines ---
+# Unclaimed tickets get a reminder after 24h and a role ping after 48h.
+REMINDER_AFTER = 24 * 3600
+ESCALATE_AFTER = 48 * 3600
+DEADLINE_COLUMNS = {"remind": "reminded_24h", "escalate": "escalated_48h"}
+
+class TicketDeadlines:
+    """Min-heap of (due_at, kind, channel_id) for unclaimed tickets.
+
+    Instead of polling the tickets table, one task sleeps until the earliest deadline
+    (or until an earlier one is pushed), fires everything due, and records it with a
+    single UPDATE. Claim/close just drop the channel from `live`; stale heap entries
+    are skipped when popped.
     """
-    
-    html_content = f"""
-    <!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Transcript - {channel_name}</title>{style}</head><body>
-         <div class="header"><h1>#{channel_name}</h1><p>Transcript generated on {datetime.datetime.now(TZ_MANILA).strftime('%Y-%m-%d %H:%M:%S')} (PHT)</p></div>
-         <div class="chat-container">
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.heap = []
+        self.live = {}  # (channel_id, kind) -> due_at
+        self.categories = {}  # channel_id -> category key
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def add_ticket(self, channel_id: int, category: str, created_at: float, reminded: bool = False, escalated: bool = False):
+        self.categories[channel_id] = category
+        if not reminded:
+            self._push(created_at + REMINDER_AFTER, "remind", channel_id)
+        if not escalated:
+            self._push(created_at + ESCALATE_AFTER, "escalate", channel_id)
+
+    def _push(self, due_at: float, kind: str, channel_id: int):
+        self.live[(channel_id, kind)] = due_at
+        heapq.heappush(self.heap, (due_at, kind, channel_id))
+        if self.heap[0][0] == due_at:
+            self.changed.set()  # new earliest deadline, re-arm the sleep
+
+    def discard(self, channel_id: int):
+        """Claimed or closed: nothing left to remind about."""
+        for kind in DEADLINE_COLUMNS:
+            self.live.pop((channel_id, kind), None)
+        self.categories.pop(channel_id, None)
+
+    def load(self, tickets: list[OpenTicket]):
+        """Rebuilds the heap from open, unclaimed tickets.
+
+        Run backfill_ticket_escalations.py once before the first deploy, or tickets that were
+        already past 48h under the old reminder loop (which never set escalated_48h) all get
+        pinged on startup.
+        """
+        self.heap.clear()
+        self.live.clear()
+        self.categories.clear()
+        for t in tickets:
+            if t.claimed_by or not t.created_at:
+                continue
+            # created_at is naive server local time like every DATETIME column, which is
+            # exactly how .timestamp() interprets a naive datetime
+            self.add_ticket(t.channel_id, t.category, t.created_at.timestamp(), t.reminded_24h, t.escalated_48h)
+        self.changed.set()
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    def _pop_due(self, now: float):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due_at, kind, channel_id = heapq.heappop(self.heap)
+            if self.live.get((channel_id, kind)) == due_at:
+                del self.live[(channel_id, kind)]
+                due.append((kind, channel_id))
+        return due
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.changed.clear()
+            timeout = max(self.heap[0][0] - time.time(), 0) if self.heap else None
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=timeout)
+                continue  # heap changed, recompute the earliest deadline
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._fire(self._pop_due(time.time()))
+            except Exception as e:
+                logging.error(f"Ticket deadline error: {e}")
+
+    async def _fire(self, due):
+        if not due:
+            return
+        fired = {kind: [] for kind in DEADLINE_COLUMNS}
+        for kind, channel_id in due:
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            try:
+                if kind == "remind":
+                    await channel.send("⏳ **Reminder:** Unclaimed for 24h.")
+                else:
+                    category = TICKET_CATEGORIES.get(self.categories.get(channel_id), {})
+                    role = channel.guild.get_role(category.get("role_id", 0))
+                    await channel.send(f"🚨 **Escalation:** Unclaimed for 48h. {role.mention if role else ''}".strip())
+                    self.categories.pop(channel_id, None)
+                fired[kind].append(channel_id)
+            except discord.HTTPException as e:
+                logging.error(f"Failed to send ticket {kind} in {channel_id}: {e}")
+
+        # One UPDATE per wake-up, however many tickets came due together
+        ids = fired["remind"] + fired["escalate"]
+        if not ids:
+            return
+        sets = []
+        params = []
+        for kind, column in DEADLINE_COLUMNS.items():
+            if fired[kind]:
+                sets.append(f"{column} = CASE WHEN channel_id IN ({', '.join(['%s'] * len(fired[kind]))}) THEN TRUE ELSE {column} END")
+                params.extend(fired[kind])
+        await db.execute(
+            f"UPDATE tickets SET {', '.join(sets)} WHERE channel_id IN ({', '.join(['%s'] * len(ids))})",
+            (*params, *ids), queue_on_failure=True
+        )
+        for kind, column in DEADLINE_COLUMNS.items():
+            for channel_id in fired[kind]:
+                ticket = ticket_index.by_channel.get(channel_id)
+                if ticket: setattr(ticket, column, True)
+
+# --- Ticket Channel Templates ---
+TICKET_FALLBACK_CATEGORY = "🎟⎮tickets"
+
+class TicketTemplateCache:
+    """Category channel and role overwrites for new tickets, resolved once per guild.
+
+    The panel's category and the per-category overwrites only change when an admin edits
+    roles or channels, so the cog's guild role/channel listeners drop a guild's entries.
     """
-    for msg in messages:
+
+    def __init__(self):
+        self.categories: dict[tuple[int, int], int] = {}  # (guild_id, panel channel_id) -> category id
+        self.base_overwrites: dict[tuple[int, str], tuple[dict, Optional[discord.Role]]] = {}
+
+    def category(self, interaction: discord.Interaction) -> Optional[discord.CategoryChannel]:
+        guild = interaction.guild
+        key = (guild.id, interaction.channel_id)
+        category_id = self.categories.get(key)
+        if category_id is not None:
+            category = guild.get_channel(category_id)
+            if category:
+                return category
+        category = interaction.channel.category or discord.utils.get(guild.categories, name=TICKET_FALLBACK_CATEGORY)
+        if category:
+            self.categories[key] = category.id
+        return category
+
+    def overwrites(self, guild: discord.Guild, category_key: str):
+        """(overwrites without the ticket creator, role to ping)."""
+        key = (guild.id, category_key)
+        if key not in self.base_overwrites:
+            role = guild.get_role(TICKET_CATEGORIES[category_key]["role_id"])
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True)
+            }
+            if role: overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+            self.base_overwrites[key] = (overwrites, role)
+        return self.base_overwrites[key]
+
+    def invalidate(self, guild_id: int):
+        self.categories = {k: v for k, v in self.categories.items() if k[0] != guild_id}
+        self.base_overwrites = {k: v for k, v in self.base_overwrites.items() if k[0] != guild_id}
+
+# --- Ticket Creation Queue ---
+TICKET_CREATE_CONCURRENCY = int(os.getenv("TICKET_CREATE_CONCURRENCY", "2"))
+
+class TicketCreationQueue:
+    """Guards ticket creation.
+
+    reserve() claims a (user, category) pair synchronously; with no await between the
+    check and the add, two submits can never both pass. slot() then bounds how many
+    tickets a guild creates at once (channel creation is rate limited per guild anyway)
+    and reports the caller's place in line when it has to wait.
+    """
+
+    def __init__(self, concurrency: int = TICKET_CREATE_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self.reserved: set[tuple[int, str]] = set()
+        self.slots: dict[int, asyncio.Semaphore] = {}
+        self.waiting: dict[int, int] = {}
+
+    def reserve(self, user_id: int, category: str) -> bool:
+        if (user_id, category) in self.reserved:
+            return False
+        self.reserved.add((user_id, category))
+        return True
+
+    def release(self, user_id: int, category: str):
+        self.reserved.discard((user_id, category))
+
+    @contextlib.asynccontextmanager
+    async def slot(self, guild_id: int, on_wait=None):
+        semaphore = self.slots.setdefault(guild_id, asyncio.Semaphore(self.concurrency))
+        if semaphore.locked():
+            self.waiting[guild_id] = self.waiting.get(guild_id, 0) + 1
+            try:
+                if on_wait:
+                    await on_wait(self.waiting[guild_id])
+                await semaphore.acquire()
+            finally:
+                self.waiting[guild_id] -= 1
+        else:
+            await semaphore.acquire()
         try:
-            avatar = msg.author.display_avatar.url if msg.author.display_avatar else "https://cdn.discordapp.com/embed/avatars/0.png"
-            username = html.escape(msg.author.display_name)
-            ts = msg.created_at.astimezone(TZ_MANILA).strftime('%m/%d/%Y %I:%M %p')
-            content = html.escape(msg.content or "")
-            # Basic Mention Parsing
-            content = re.sub(r'&lt;@!?(\d+)&gt;', r'<span class="mention">@\1</span>', content)
-            
-            attachments = ""
-            for att in msg.attachments:
-                if att.content_type and att.content_type.startswith('image/'):
-                    attachments += f'<div class="attachment"><a href="{att.url}" target="_blank"><img src="{att.url}"></a></div>'
-                else:
-                    attachments += f'<div class="attachment"><a href="{att.url}" target="_blank">📄 {html.escape(att.filename)}</a></div>'
-
-            html_content += f"""
-            <div class="message-group">
-                <img class="avatar" src="{avatar}">
-                <div class="content">
-                    <div class="meta"><span class="username">{username}</span><span class="timestamp">{ts}</span></div>
-                    <div class="text">{content}</div>
-                    {attachments}
-                </div>
-            </div>"""
-        except: continue
-    
-    html_content += "</div></body></html>"
-    return html_content
+            yield
+        finally:
+            semaphore.release()
+
+# --- Ticket Lifecycle Stats ---
+TICKET_STATS_DAYS = int(os.getenv("TICKET_STATS_DAYS", "90"))
+LIFECYCLE_METRICS = {"first_reply": "First staff reply", "claim": "Claim", "resolution": "Resolution"}
+STATS_QUANTILES = (0.5, 0.9, 0.99)
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    if seconds < 86400:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+
+class TicketLifecycleStats:
+    """Quantile sketches of ticket durations (seconds from creation) per guild, category and metric.
+
+    Seeded at startup from tickets closed in the last TICKET_STATS_DAYS plus the open
+    ticket index, then fed by claim / first staff reply / close as they happen, so
+    /ticket_stats never scans the tickets table.
+    """
+
+    def __init__(self):
+        self.sketches: dict[tuple[int, str, str], QuantileSketch] = {}
+
+    def record(self, guild_id: int, category: str, metric: str, start: Optional[datetime.datetime], end: Optional[datetime.datetime]):
+        if not start or not end:
+            return
+        key = (guild_id, category, metric)
+        if key not in self.sketches:
+            self.sketches[key] = QuantileSketch()
+        self.sketches[key].add((end - start).total_seconds())
+
+    def record_ticket(self, guild_id, category, created_at, first_staff_reply_at, claimed_at, closed_at=None):
+        self.record(guild_id, category, "first_reply", created_at, first_staff_reply_at)
+        self.record(guild_id, category, "claim", created_at, claimed_at)
+        self.record(guild_id, category, "resolution", created_at, closed_at)
+
+    async def load(self, open_tickets):
+        self.sketches.clear()
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=TICKET_STATS_DAYS)
+        rows = await db.fetchall(
+            "SELECT guild_id, category, created_at, first_staff_reply_at, claimed_at, closed_at FROM tickets WHERE closed_at >= %s",
+            (cutoff,), row_mode=ROWS_TUPLE
+        )
+        for row in rows:
+            self.record_ticket(*row)
+        for t in open_tickets:
+            self.record_ticket(t.guild_id, t.category, t.created_at, t.first_staff_reply_at, t.claimed_at)
+        logging.info(f"Ticket stats seeded from {len(rows)} closed ticket(s).")
+
+    def summary(self, guild_id: int, category: Optional[str] = None) -> dict[str, QuantileSketch]:
+        merged = {}
+        for (g, cat, metric), sketch in self.sketches.items():
+            if g != guild_id or (category and cat != category):
+                continue
+            merged.setdefault(metric, QuantileSketch()).merge(sketch)
+        return merged
+
+# --- Auto-Assignment ---
+# Needs the presences intent (main.py enables it with this flag) to know who is online
+TICKET_AUTO_ASSIGN = os.getenv("TICKET_AUTO_ASSIGN", "false").lower() == "true"
+
+class HandlerLoadBalancer:
+    """Picks the least-loaded online handler for a category role.
+
+    Each (guild, role) has a min-heap of (open claimed tickets, user_id) over its online
+    members. Loads change on claim/close and membership on presence/role updates; old
+    heap entries are left in place and skipped when they no longer match (lazy deletion),
+    so a pick is O(log n) without touching the DB or the guild's member list.
+    """
+
+    def __init__(self):
+        self.loads: dict[tuple[int, int], int] = {}  # (guild_id, user_id) -> open claimed tickets
+        self.online: dict[tuple[int, int], set[int]] = {}  # (guild_id, role_id) -> online handlers
+        self.heaps: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self.role_ids = {data["role_id"] for data in TICKET_CATEGORIES.values()}
+
+    def load(self, tickets: list[OpenTicket]):
+        self.loads.clear()
+        for t in tickets:
+            if t.claimed_by:
+                key = (t.guild_id, t.claimed_by)
+                self.loads[key] = self.loads.get(key, 0) + 1
+
+    def _seed(self, guild: discord.Guild, role_ids: set[int]):
+        # One pass over the guild's members for every handler role, the first time the guild
+        # picks a handler (role.members would walk all members once per role); member_changed
+        # keeps the sets current after that
+        online = {role_id: set() for role_id in role_ids}
+        for m in guild.members:
+            if m.bot or m.status is discord.Status.offline:
+                continue
+            for role_id in role_ids:
+                if m.get_role(role_id):
+                    online[role_id].add(m.id)
+        for role_id, members in online.items():
+            self.online[(guild.id, role_id)] = members
+            self.heaps[(guild.id, role_id)] = [(self.loads.get((guild.id, uid), 0), uid) for uid in members]
+            heapq.heapify(self.heaps[(guild.id, role_id)])
+
+    def _push(self, guild_id: int, user_id: int):
+        load = self.loads.get((guild_id, user_id), 0)
+        for role_id in self.role_ids:
+            key = (guild_id, role_id)
+            if user_id in self.online.get(key, ()):
+                heap = self.heaps[key]
+                heapq.heappush(heap, (load, user_id))
+                if len(heap) > 2 * len(self.online[key]) + 16:
+                    # Mostly stale entries; rebuild from the current loads
+                    self.heaps[key] = [(self.loads.get((guild_id, uid), 0), uid) for uid in self.online[key]]
+                    heapq.heapify(self.heaps[key])
+
+    def pick(self, role: discord.Role) -> Optional[int]:
+        key = (role.guild.id, role.id)
+        if key not in self.online and role.guild.chunked:
+            self._seed(role.guild, self.role_ids | {role.id})
+        heap, online = self.heaps.get(key, []), self.online.get(key, set())
+        while heap:
+            load, user_id = heap[0]
+            if user_id in online and load == self.loads.get((role.guild.id, user_id), 0):
+                return user_id
+            heapq.heappop(heap)
+        return None
+
+    def claimed(self, guild_id: int, user_id: int):
+        self.loads[(guild_id, user_id)] = self.loads.get((guild_id, user_id), 0) + 1
+        self._push(guild_id, user_id)
+
+    def released(self, guild_id: int, user_id: int):
+        key = (guild_id, user_id)
+        if self.loads.get(key):
+            self.loads[key] -= 1
+            if not self.loads[key]:
+                del self.loads[key]
+            self._push(guild_id, user_id)
+
+    def member_changed(self, member: discord.Member):
+        """Re-evaluates a member's availability after a presence or role change."""
+        if member.bot:
+            return
+        available = member.status is not discord.Status.offline
+        member_roles = {r.id for r in member.roles}
+        for role_id in self.role_ids:
+            key = (member.guild.id, role_id)
+            if key not in self.online:
+                continue  # not seeded yet, _seed will see the current state
+            if available and role_id in member_roles:
+                if member.id not in self.online[key]:
+                    self.online[key].add(member.id)
+                    heapq.heappush(self.heaps[key], (self.loads.get((member.guild.id, member.id), 0), member.id))
+            else:
+                self.online[key].discard(member.id)
+
+# --- Live Dashboard ---
+TICKET_DASHBOARD_INTERVAL = float(os.getenv("TICKET_DASHBOARD_INTERVAL", "5"))  # min seconds between edits
+
+class TicketDashboard:
+    """One self-updating queue overview message per guild.
+
+    Ticket events call refresh(), which only marks the guild dirty. The first change
+    after a quiet period is shown at once; further changes within TICKET_DASHBOARD_INTERVAL
+    are coalesced into a single edit rendered from the open ticket index at that moment.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.pending: dict[int, asyncio.Task] = {}  # guild_id -> flush waiting to edit
+        self.tasks: set[asyncio.Task] = set()  # every flush still running, for stop()
+        self.last_edit: dict[int, float] = {}
+
+    def refresh(self, guild_id: int):
+        if guild_id not in self.pending:
+            task = self.pending[guild_id] = asyncio.create_task(self._flush(guild_id))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.pending.clear()
+
+    async def _flush(self, guild_id: int):
+        try:
+            delay = self.last_edit.get(guild_id, 0) + TICKET_DASHBOARD_INTERVAL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            # Changes from here on schedule the next edit
+            self.pending.pop(guild_id, None)
+
+        try:
+            settings = await guild_settings.get(guild_id)
+        except Exception as e:
+            logging.error(f"Failed to load ticket dashboard settings for guild {guild_id}: {e}")
+            return
+        if not settings.ticket_dashboard_message_id:
+            return
+        channel = self.bot.get_channel(settings.ticket_dashboard_channel_id)
+        if not channel:
+            return
+        self.last_edit[guild_id] = time.monotonic()
+        try:
+            await channel.get_partial_message(settings.ticket_dashboard_message_id).edit(embed=self.render(guild_id))
+        except discord.NotFound:
+            logging.warning(f"Ticket dashboard message in guild {guild_id} is gone, run /ticket_dashboard again.")
+            await guild_settings.set(guild_id, "ticket_dashboard_message_id", None)
+        except discord.HTTPException as e:
+            logging.error(f"Failed to update ticket dashboard in guild {guild_id}: {e}")
+
+    def render(self, guild_id: int) -> discord.Embed:
+        open_count = {key: 0 for key in TICKET_CATEGORIES}
+        oldest_unclaimed = {}
+        handlers = {}
+        for t in ticket_index.values():
+            if t.guild_id != guild_id:
+                continue
+            open_count[t.category] = open_count.get(t.category, 0) + 1
+            if t.claimed_by:
+                handlers[t.claimed_by] = handlers.get(t.claimed_by, 0) + 1
+            elif t.category not in oldest_unclaimed or t.created_at < oldest_unclaimed[t.category]:
+                oldest_unclaimed[t.category] = t.created_at
+
+        embed = discord.Embed(title="🎫 Ticket Queue", color=COLOR_GOLD, timestamp=datetime.datetime.now(datetime.timezone.utc))
+        for key, count in open_count.items():
+            data = TICKET_CATEGORIES.get(key, {"emoji": "❔", "label": key})
+            value = f"**{count}** open"
+            if key in oldest_unclaimed:
+                value += f"\nOldest unclaimed: <t:{int(oldest_unclaimed[key].timestamp())}:R>"
+            embed.add_field(name=f"{data['emoji']} {data['label']}", value=value, inline=True)
+
+        busiest = sorted(handlers.items(), key=lambda h: -h[1])[:20]
+        embed.add_field(
+            name="👥 Handlers",
+            value="\n".join(f"<@{user_id}>: **{count}**" for user_id, count in busiest) or "No claimed tickets.",
+            inline=False
+        )
+        embed.set_footer(text="Updates automatically")
+        return embed
+
+# --- Ticket Ratings ---
+RATING_LEADERBOARD_MIN = int(os.getenv("RATING_LEADERBOARD_MIN", "3"))  # ratings needed to be ranked
+
+async def record_ticket_rating(channel_id: int, user: discord.abc.User, stars: int, remarks: str) -> Optional[dict]:
+    """Stores a rating and bumps the handler's running totals.
+
+    Returns the ticket row, or None if the user can't rate it (not the creator, or
+    already rated). Claiming rated_at first means a double submit is counted once;
+    if the rating can't be stored the claim is released again. Once it is stored the
+    call succeeds even if the handler totals can't be updated.
+    """
+    claimed = await db.execute(
+        "UPDATE tickets SET rated_at = %s WHERE channel_id = %s AND creator_id = %s AND status = 'closed' AND rated_at IS NULL",
+        (datetime.datetime.now(), channel_id, user.id)
+    )
+    if not claimed:
+        return None
+    try:
+        ticket = await db.fetchrow("SELECT guild_id, channel_name, claimed_by, is_test FROM tickets WHERE channel_id = %s", (channel_id,), primary=True)
+        if ticket['is_test']:
+            return ticket  # test tickets aren't recorded
+        await db.execute(
+            "INSERT INTO ticket_ratings (ticket_name, user_id, handler_mention, stars, remarks, channel_id, guild_id, handler_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (ticket['channel_name'], user.id, f"<@{ticket['claimed_by']}>" if ticket['claimed_by'] else "Staff", stars, remarks or None,
+             channel_id, ticket['guild_id'], ticket['claimed_by']),
+            queue_on_failure=True
+        )
+    except Exception:
+        # Release the claim so the user can submit again instead of the rating being lost
+        await db.execute("UPDATE tickets SET rated_at = NULL WHERE channel_id = %s", (channel_id,), queue_on_failure=True)
+        raise
+    if ticket['claimed_by']:
+        column = f"stars_{stars}"  # stars is 1-5, checked by the button template
+        try:
+            await db.execute(
+                f"INSERT INTO handler_rating_stats (guild_id, handler_id, rating_count, rating_sum, {column}) VALUES (%s, %s, 1, %s, 1) "
+                f"ON DUPLICATE KEY UPDATE rating_count = rating_count + 1, rating_sum = rating_sum + %s, {column} = {column} + 1",
+                (ticket['guild_id'], ticket['claimed_by'], stars, stars), queue_on_failure=True
+            )
+        except Exception as e:
+            # The rating is already in ticket_ratings, so a retry would only be told
+            # "already rated"; report success and leave the totals to be corrected by hand
+            logging.error(f"Failed to update rating stats for handler {ticket['claimed_by']} (ticket {channel_id}): {e}")
+    return ticket
+
+class FeedbackModal(discord.ui.Modal):
+    def __init__(self, channel_id: int, stars: int):
+        super().__init__(title=f"You rated {stars} Stars!")
+        self.channel_id = channel_id
+        self.stars = stars
+        self.remarks = discord.ui.TextInput(
+            label="Any comments? (Optional)",
+            style=discord.TextStyle.paragraph,
+            placeholder="Let us know how we can improve...",
+            required=False,
+            max_length=1000
+        )
+        self.add_item(self.remarks)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            ticket = await record_ticket_rating(self.channel_id, interaction.user, self.stars, self.remarks.value)
+        except Exception as e:
+            logging.error(f"Failed to record rating for ticket {self.channel_id}: {e}")
+            await interaction.response.send_message("❌ Couldn't save your rating right now, please try again in a moment.", ephemeral=True)
+            return
+        if not ticket:
+            await interaction.response.edit_message(content="✅ You've already rated this ticket. Thank you!", view=None, embed=None)
+            return
+        await interaction.response.edit_message(content=f"✅ Thank you for your feedback! You rated us **{self.stars}/5** ⭐", view=None, embed=None)
+        if ticket['is_test']:
+            return
+
+        settings = await guild_settings.get(ticket['guild_id'])
+        log_channel = interaction.client.get_channel(settings.ticket_transcript_channel_id) if settings.ticket_transcript_channel_id else None
+        if log_channel:
+            embed = discord.Embed(title="🌟 New Feedback Received", color=COLOR_GOLD, timestamp=datetime.datetime.now(TZ_MANILA))
+            embed.add_field(name="User", value=interaction.user.mention, inline=True)
+            embed.add_field(name="Ticket", value=ticket['channel_name'] or "unknown", inline=True)
+            embed.add_field(name="Handler", value=f"<@{ticket['claimed_by']}>" if ticket['claimed_by'] else "Staff", inline=True)
+            embed.add_field(name="Rating", value=f"{'⭐' * self.stars} ({self.stars}/5)", inline=False)
+            if self.remarks.value:
+                embed.add_field(name="Remarks", value=self.remarks.value, inline=False)
+            embed.set_footer(text="System developed by Aedwon")
+            try:
+                await log_channel.send(embed=embed)
+            except discord.HTTPException as e:
+                logging.error(f"Failed to log ticket rating: {e}")
+
+class RatingButton(discord.ui.DynamicItem[discord.ui.Button], template=r"rate:(?P<channel_id>\d+):(?P<stars>[1-5])"):
+    """Star button that carries its ticket in the custom_id, so it keeps working after a restart."""
+
+    def __init__(self, channel_id: int, stars: int):
+        super().__init__(discord.ui.Button(
+            label=str(stars), emoji="⭐", custom_id=f"rate:{channel_id}:{stars}",
+            style=discord.ButtonStyle.success if stars == 5 else discord.ButtonStyle.secondary
+        ))
+        self.channel_id = channel_id
+        self.stars = stars
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["channel_id"]), int(match["stars"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(FeedbackModal(self.channel_id, self.stars))
+
+class RatingView(discord.ui.View):
+    def __init__(self, channel_id: int):
+        super().__init__(timeout=None)
+        for stars in range(1, 6):
+            self.add_item(RatingButton(channel_id, stars))
+
+async def request_rating(client: discord.Client, ticket: OpenTicket, channel_name: str):
+    """DMs the ticket creator a 1-5 star rating prompt for the handler."""
+    try:
+        creator = client.get_user(ticket.creator_id) or await client.fetch_user(ticket.creator_id)
+        handler = f"<@{ticket.claimed_by}>" if ticket.claimed_by else "Staff"
+        embed = discord.Embed(
+            title="How was our service?",
+            description=f"Your ticket `{channel_name}` has been closed.\nPlease rate your experience with {handler}.",
+            color=0x5865F2
+        )
+        await creator.send(embed=embed, view=RatingView(ticket.channel_id))
+    except discord.Forbidden:
+        pass  # DMs blocked
+    except discord.HTTPException as e:
+        logging.error(f"Failed to send rating request for {channel_name}: {e}")
+
+# --- Transcript Search ---
+# Closed tickets keep their ticket_messages rows as the structured transcript. MySQL indexes
+# content with a FULLTEXT index; SQLite needs the rows copied into an FTS5 table on close.
+SEARCH_MAX_TERMS = 8
+SNIPPET_WIDTH = 160
+
+async def index_closed_ticket(channel_id: int):
+    """Adds a closed ticket's messages to the SQLite FTS index (MySQL keeps its FULLTEXT
+    index itself). A close that is retried only indexes messages not indexed yet: FTS5
+    keeps one _docsize row per indexed rowid."""
+    if db.backend.name == "sqlite":
+        await db.execute(
+            """INSERT INTO ticket_messages_fts (rowid, content)
+               SELECT message_id, content FROM ticket_messages m WHERE channel_id = %s
+               AND NOT EXISTS (SELECT 1 FROM ticket_messages_fts_docsize d WHERE d.id = m.message_id)""",
+            (channel_id,)
+        )
+
+async def search_ticket_messages(guild_id: int, terms: list[str], limit: int = 10):
+    """Closed tickets with a message containing every term, newest first, one row per
+    ticket (its latest matching message plus the number of matches).
+
+    Matches are grouped per ticket before sorting, so only one row per ticket is ordered
+    instead of every matching message (snowflake ids: the highest is the newest).
+    """
+    if db.backend.name == "sqlite":
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        query = """SELECT m.message_id, m.author_name, m.content, m.created_at, t.channel_name, t.category, hits.matches
+                   FROM (SELECT m.channel_id, MAX(m.message_id) AS message_id, COUNT(*) AS matches
+                         FROM ticket_messages_fts f
+                         JOIN ticket_messages m ON m.message_id = f.rowid
+                         JOIN tickets t ON t.channel_id = m.channel_id
+                         WHERE ticket_messages_fts MATCH %s AND t.guild_id = %s AND t.status = 'closed'
+                         GROUP BY m.channel_id ORDER BY message_id DESC LIMIT %s) hits
+                   JOIN ticket_messages m ON m.message_id = hits.message_id
+                   JOIN tickets t ON t.channel_id = hits.channel_id
+                   ORDER BY m.message_id DESC"""
+    else:
+        match = " ".join(f"+{t}*" for t in terms)
+        query = """SELECT m.message_id, m.author_name, m.content, m.created_at, t.channel_name, t.category, hits.matches
+                   FROM (SELECT m.channel_id, MAX(m.message_id) AS message_id, COUNT(*) AS matches
+                         FROM ticket_messages m
+                         JOIN tickets t ON t.channel_id = m.channel_id
+                         WHERE MATCH(m.content) AGAINST (%s IN BOOLEAN MODE) AND t.guild_id = %s AND t.status = 'closed'
+                         GROUP BY m.channel_id ORDER BY message_id DESC LIMIT %s) hits
+                   JOIN ticket_messages m ON m.message_id = hits.message_id
+                   JOIN tickets t ON t.channel_id = hits.channel_id
+                   ORDER BY m.message_id DESC"""
+    return await db.fetchall(query, (match, guild_id, limit))
+
+def make_snippet(content: str, terms: list[str], width: int = SNIPPET_WIDTH) -> str:
+    """Window of content around the first matched term, with matches in bold."""
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    m = pattern.search(content)
+    start = max((m.start() if m else 0) - width // 3, 0)
+    snippet = content[start:start + width]
+    snippet = discord.utils.escape_markdown(snippet)
+    snippet = pattern.sub(lambda x: f"**{x.group(0)}**", snippet)
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(content) else "")
 
 # --- UI Components ---
 class TicketTopicSelect(discord.ui.Select):
@@ -124,22 +787,38 @@ class TicketModal(discord.ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        creation = interaction.client.get_cog("Tickets").creation
+        user_id = interaction.user.id
+
+        # One in-flight creation per (user, category), so a double submit can't open two channels
+        if not creation.reserve(user_id, self.category_key):
+            await interaction.followup.send("⏳ Your ticket is already being created, hang tight.", ephemeral=True)
+            return
+        try:
+            async def notify_position(position):
+                await interaction.followup.send(f"⏳ Several tickets are being opened right now. You're **#{position}** in line...", ephemeral=True)
+
+            async with creation.slot(interaction.guild.id, notify_position):
+                await self.open_ticket(interaction)
+        finally:
+            creation.release(user_id, self.category_key)
+
+    async def open_ticket(self, interaction: discord.Interaction):
         guild = interaction.guild
         user = interaction.user
+        cog = interaction.client.get_cog("Tickets")
         
         # Determine Category Channel
-        category_channel = interaction.channel.category
-        if not category_channel:
-            category_channel = discord.utils.get(guild.categories, name="🎟⎮tickets")
+        category_channel = cog.templates.category(interaction)
 
         if not category_channel:
              await interaction.followup.send("❌ Error: Could not determine category.", ephemeral=True)
              return
 
         # Check existing
-        row = await db.fetchrow("SELECT channel_id FROM tickets WHERE creator_id = %s AND status = 'open' AND category = %s", (user.id, self.category_key))
-        if row:
-             ch = guild.get_channel(row['channel_id'])
+        existing = await ticket_index.find(user.id, self.category_key)
+        if existing:
+             ch = guild.get_channel(existing.channel_id)
              if ch:
                  await interaction.followup.send(f"❌ You already have a ticket of this type open: {ch.mention}", ephemeral=True)
                  return
@@ -147,37 +826,75 @@ class TicketModal(discord.ui.Modal):
         tag = self.category_data["tag"]
         channel_name = f"[{tag}]-{user.name}"
         
-        # Permissions
-        role_to_ping_id = self.category_data["role_id"]
-        role_to_ping = guild.get_role(role_to_ping_id)
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True)
-        }
-        if role_to_ping: overwrites[role_to_ping] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        # Permissions (role part resolved once per guild/category, user added per ticket)
+        base_overwrites, role_to_ping = cog.templates.overwrites(guild, self.category_key)
+        overwrites = {**base_overwrites, user: discord.PermissionOverwrite(view_channel=True, send_messages=True)}
         
         try:
             ticket_channel = await guild.create_text_channel(channel_name, category=category_channel, overwrites=overwrites)
-            
-            # DB Insert
-            await db.execute(
-                "INSERT INTO tickets (channel_id, guild_id, creator_id, category, status) VALUES (%s, %s, %s, %s, 'open')",
-                (ticket_channel.id, guild.id, user.id, self.category_key)
-            )
-
-            embed = discord.Embed(title=f"{self.category_data['emoji']} {self.category_data['label']}", description=f"**Subject:** {self.ticket_subject.value}\n\n{self.ticket_desc.value}", color=COLOR_GOLD)
-            embed.set_author(name=user.display_name, icon_url=user.display_avatar.url)
-            embed.set_footer(text=f"Ticket ID: {ticket_channel.id}")
-            
-            view = TicketActionsView()
-            mention_text = role_to_ping.mention if role_to_ping else ""
-            await ticket_channel.send(content=f"{user.mention} {mention_text}", embed=embed, view=view)
-            await interaction.followup.send(f"✅ Ticket created: {ticket_channel.mention}", ephemeral=True)
-            
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
             logging.error(f"Ticket creation error: {e}")
+            return
+
+        embed = discord.Embed(title=f"{self.category_data['emoji']} {self.category_data['label']}", description=f"**Subject:** {self.ticket_subject.value}\n\n{self.ticket_desc.value}", color=COLOR_GOLD)
+        embed.set_author(name=user.display_name, icon_url=user.display_avatar.url)
+        embed.set_footer(text=f"Ticket ID: {ticket_channel.id}")
+        
+        view = TicketActionsView()
+        mention_text = role_to_ping.mention if role_to_ping else ""
+
+        # The row goes in first so nobody is pinged or told about a ticket that then gets deleted
+        try:
+            ticket = await ticket_index.create(ticket_channel.id, guild.id, user.id, self.category_key)
+        except Exception as e:
+            # Without a tickets row the channel can't be claimed or closed; don't leave it behind
+            logging.error(f"Ticket creation error (DB insert) in {ticket_channel.name}: {e}")
+            await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
+            try:
+                await ticket_channel.delete(reason="Ticket creation failed")
+            except discord.HTTPException:
+                pass
+            return
+
+        # The welcome message and the user's follow-up don't depend on each other
+        welcome, followup = await asyncio.gather(
+            ticket_channel.send(content=f"{user.mention} {mention_text}", embed=embed, view=view),
+            interaction.followup.send(f"✅ Ticket created: {ticket_channel.mention}", ephemeral=True),
+            return_exceptions=True
+        )
+        for step, result in (("welcome message", welcome), ("follow-up", followup)):
+            if isinstance(result, BaseException):
+                logging.error(f"Ticket creation error ({step}) in {ticket_channel.name}: {result}")
+
+        cog.deadlines.add_ticket(ticket_channel.id, self.category_key, time.time())
+        cog.dashboard.refresh(guild.id)
+        if TICKET_AUTO_ASSIGN and role_to_ping:
+            await self.auto_assign(cog, ticket, role_to_ping, welcome)
+
+    async def auto_assign(self, cog, ticket: OpenTicket, role: discord.Role, welcome):
+        handler_id = cog.balancer.pick(role)
+        if not handler_id:
+            return  # nobody online, the role ping stands and it gets claimed manually
+        try:
+            if not await ticket_index.claim(ticket.channel_id, handler_id):
+                return
+        except Exception as e:
+            logging.error(f"Auto-assign failed for {ticket.channel_id}: {e}")
+            return
+        cog.ticket_claimed(ticket)
+
+        handler = role.guild.get_member(handler_id)
+        channel = role.guild.get_channel(ticket.channel_id)
+        try:
+            embed = discord.Embed(description=f"📌 Auto-assigned to <@{handler_id}>.", color=COLOR_SUCCESS)
+            await channel.send(content=f"<@{handler_id}>", embed=embed)
+            if isinstance(welcome, discord.Message):
+                view = TicketActionsView()
+                view.mark_claimed(handler.display_name if handler else str(handler_id))
+                await welcome.edit(view=view)
+        except (discord.HTTPException, AttributeError) as e:
+            logging.error(f"Auto-assign notice failed in {ticket.channel_id}: {e}")
 
 class TicketActionsView(discord.ui.View):
     def __init__(self):
@@ -186,23 +903,26 @@ class TicketActionsView(discord.ui.View):
     @discord.ui.button(label="🛠 Claim Ticket", style=discord.ButtonStyle.success, custom_id="claim_ticket")
     async def claim_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True)
-        row = await db.fetchrow("SELECT claimed_by, category FROM tickets WHERE channel_id = %s", (interaction.channel_id,))
-        if not row: return
+        ticket = await ticket_index.get(interaction.channel_id)
+        if not ticket: return
         
-        if row['claimed_by']:
-            await interaction.followup.send("❌ Already claimed.", ephemeral=True)
-            return
-            
         # Permission Check ( Simplified )
         # Real logic should check if user has access based on category role or admin
-        await db.execute("UPDATE tickets SET claimed_by = %s WHERE channel_id = %s", (interaction.user.id, interaction.channel_id))
+        if not await ticket_index.claim(interaction.channel_id, interaction.user.id):
+            await interaction.followup.send("❌ Already claimed.", ephemeral=True)
+            return
+        cog = interaction.client.get_cog("Tickets")
+        if cog: cog.ticket_claimed(ticket)
         
         embed = discord.Embed(description=f"✅ {interaction.user.mention} has claimed this ticket.", color=COLOR_SUCCESS)
         await interaction.channel.send(embed=embed)
-        button.disabled = True
-        button.label = f"Claimed by {interaction.user.display_name}"
+        self.mark_claimed(interaction.user.display_name)
         await interaction.message.edit(view=self)
 
+    def mark_claimed(self, handler_name: str):
+        self.claim_ticket.disabled = True
+        self.claim_ticket.label = f"Claimed by {handler_name}"
+
     @discord.ui.button(label="Close Ticket", style=discord.ButtonStyle.danger, custom_id="close_ticket")
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(CloseReasonModal())
@@ -218,20 +938,26 @@ class CloseReasonModal(discord.ui.Modal):
         # Log and Close
         channel = interaction.channel
         
-        # Transcript
-        messages = [m async for m in channel.history(limit=500, oldest_first=True)]
-        html = generate_html_transcript(messages, channel.name)
-        file = discord.File(io.StringIO(html), filename=f"transcript-{channel.name}.html")
+        # Transcript (rendered from captured messages; tickets opened before capture fall back to history)
+        cog = interaction.client.get_cog("Tickets")
+        cog.deadlines.discard(channel.id)
+        # Catch up on anything capture missed (ticket opened before capture, bot offline, ...)
+        await cog.backfill_ticket(channel)
+        await cog.wait_for_archives(channel.id)
+        messages = await load_ticket_messages(channel.id)
+        package = await cog.transcripts.render(messages, channel.name, interaction.guild.filesize_limit)
         
-        # Mark Closed in DB
-        await db.execute("UPDATE tickets SET status = 'closed' WHERE channel_id = %s", (channel.id,))
+        # Mark Closed in DB (+ drop from the open ticket index)
+        ticket = await ticket_index.close(channel.id, channel.name)
+        if ticket: cog.ticket_closed(ticket)
+        try:
+            await index_closed_ticket(channel.id)
+        except Exception as e:
+            logging.error(f"Failed to index transcript for {channel.name}: {e}")
         
         # Send Log
-        # Send Log
-        log_channel_id = None
-        settings_row = await db.fetchrow("SELECT ticket_transcript_channel_id FROM guild_settings WHERE guild_id = %s", (interaction.guild.id,))
-        if settings_row:
-             log_channel_id = settings_row.get('ticket_transcript_channel_id')
+        settings = await guild_settings.get(interaction.guild.id)
+        log_channel_id = settings.ticket_transcript_channel_id
 
         # Fallback to TICKET_LOG_CHANNEL_ID if configured or if no DB setting (legacy support)
         # But prefer DB.
@@ -240,26 +966,183 @@ class CloseReasonModal(discord.ui.Modal):
         if log_channel_id:
              target_log_channel = interaction.guild.get_channel(log_channel_id)
         
-        if target_log_channel:
-            embed = discord.Embed(title="Ticket Closed", color=COLOR_ERROR, timestamp=datetime.datetime.now(TZ_MANILA))
-            embed.add_field(name="Ticket", value=channel.name)
-            embed.add_field(name="Closed By", value=interaction.user.mention)
-            embed.add_field(name="Reason", value=self.reason.value)
-            await target_log_channel.send(embed=embed, file=file)
+        try:
+            if target_log_channel:
+                embed = discord.Embed(title="Ticket Closed", color=COLOR_ERROR, timestamp=datetime.datetime.now(TZ_MANILA))
+                embed.add_field(name="Ticket", value=channel.name)
+                embed.add_field(name="Closed By", value=interaction.user.mention)
+                embed.add_field(name="Reason", value=self.reason.value)
+                embed.add_field(name="Transcript", value=size_report(package), inline=False)
+                # One part per message so each upload stays under the guild limit
+                for i, (path, filename) in enumerate(package.files):
+                    await target_log_channel.send(embed=embed if i == 0 else None, file=discord.File(path, filename=filename))
+        finally:
+            for path, _ in package.files:
+                os.remove(path)
+
+        if ticket:
+            await request_rating(interaction.client, ticket, channel.name)
             
         await channel.delete()
 
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_ticket_reminders.start()
+        self.transcripts = TranscriptRenderer()
+        self.pending_archives: dict[int, set[asyncio.Task]] = {}
+        self.deadlines = TicketDeadlines(bot)
+        self.creation = TicketCreationQueue()
+        self.templates = TicketTemplateCache()
+        self.stats = TicketLifecycleStats()
+        self.balancer = HandlerLoadBalancer()
+        self.dashboard = TicketDashboard(bot)
+        self.backfill_task: Optional[asyncio.Task] = None
 
-    def cog_unload(self):
-        self.check_ticket_reminders.cancel()
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RatingButton)
+        if self.backfill_task:
+            self.backfill_task.cancel()
+        self.deadlines.stop()
+        self.dashboard.stop()
+        await self.transcripts.stop()
 
     async def cog_load(self):
         self.bot.add_view(TicketCreateView())
         self.bot.add_view(TicketActionsView())
+        self.bot.add_dynamic_items(RatingButton)
+        self.transcripts.start()
+        await attachment_store.load()
+        self.deadlines.load(list(ticket_index.values()))
+        try:
+            await self.stats.load(list(ticket_index.values()))
+        except Exception as e:
+            logging.error(f"Failed to seed ticket stats: {e}")
+        self.balancer.load(list(ticket_index.values()))
+        self.deadlines.start()
+        self.backfill_task = asyncio.create_task(self.backfill_open_tickets())
+
+    def ticket_claimed(self, ticket: OpenTicket):
+        self.deadlines.discard(ticket.channel_id)
+        self.stats.record(ticket.guild_id, ticket.category, "claim", ticket.created_at, ticket.claimed_at)
+        self.balancer.claimed(ticket.guild_id, ticket.claimed_by)
+        self.dashboard.refresh(ticket.guild_id)
+
+    def ticket_closed(self, ticket: OpenTicket):
+        self.stats.record(ticket.guild_id, ticket.category, "resolution", ticket.created_at, datetime.datetime.now())
+        if ticket.claimed_by:
+            self.balancer.released(ticket.guild_id, ticket.claimed_by)
+        self.dashboard.refresh(ticket.guild_id)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        if (before.status is discord.Status.offline) != (after.status is discord.Status.offline):
+            self.balancer.member_changed(after)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self.balancer.member_changed(after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.templates.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.templates.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.category_id != after.category_id:
+            self.templates.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.templates.invalidate(channel.guild.id)
+        if ticket_index.is_open(channel.id):
+            # Deleted by hand instead of through Close: close it so the creator isn't
+            # blocked and the handler, deadlines and dashboard stop counting it
+            ticket = ticket_index.by_channel[channel.id]
+            self.deadlines.discard(channel.id)
+            self.ticket_closed(ticket)
+            try:
+                await ticket_index.close(channel.id, channel.name)  # drops it from the index first
+            except Exception as e:
+                logging.error(f"Failed to mark deleted ticket channel {channel.name} closed: {e}")
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if not ticket_index.is_open(message.channel.id):
+            return
+        ticket = ticket_index.by_channel[message.channel.id]
+        # Only the creator and staff can see a ticket, so anyone else talking is staff
+        if not ticket.first_staff_reply_at and not message.author.bot and message.author.id != ticket.creator_id:
+            if await ticket_index.record_first_staff_reply(ticket.channel_id):
+                self.stats.record(ticket.guild_id, ticket.category, "first_reply", ticket.created_at, ticket.first_staff_reply_at)
+        await self.capture(message)
+
+    async def capture(self, message: discord.Message):
+        try:
+            await store_ticket_message(message)
+        except Exception as e:
+            logging.error(f"Failed to capture ticket message {message.id}: {e}")
+            return
+        if message.attachments:
+            task = asyncio.create_task(archive_ticket_attachments(message))
+            pending = self.pending_archives.setdefault(message.channel.id, set())
+            pending.add(task)
+            task.add_done_callback(lambda t, ch=message.channel.id: self._archive_done(ch, t))
+
+    async def backfill_ticket(self, channel: discord.TextChannel) -> int:
+        """Stores history the live capture missed: before the first captured message (ticket
+        was open at deploy) and after the last one (sent while the bot was offline)."""
+        first_id, last_id = await captured_range(channel.id)
+        ranges = [{"before": discord.Object(first_id)}, {"after": discord.Object(last_id)}] if first_id else [{}]
+        stored = 0
+        for bounds in ranges:
+            async for m in channel.history(limit=None, oldest_first=True, **bounds):
+                await self.capture(m)
+                stored += 1
+        return stored
+
+    async def backfill_open_tickets(self):
+        await self.bot.wait_until_ready()
+        stored = 0
+        for ticket in list(ticket_index.values()):
+            channel = self.bot.get_channel(ticket.channel_id)
+            if not channel:
+                continue
+            try:
+                stored += await self.backfill_ticket(channel)
+            except Exception as e:
+                logging.error(f"Failed to backfill ticket messages in {ticket.channel_id}: {e}")
+        logging.info(f"Backfilled {stored} ticket message(s) missed while offline.")
+
+    def _archive_done(self, channel_id: int, task: asyncio.Task):
+        pending = self.pending_archives.get(channel_id)
+        if pending is not None:
+            pending.discard(task)
+            if not pending:
+                del self.pending_archives[channel_id]
+        if not task.cancelled() and task.exception():
+            logging.error(f"Failed to archive attachments in {channel_id}: {task.exception()}")
+
+    async def wait_for_archives(self, channel_id: int, timeout: float = 30):
+        """Lets in-flight attachment downloads finish so the transcript can link the archived copies."""
+        pending = list(self.pending_archives.get(channel_id, ()))
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+
+    @commands.Cog.listener()
+    async def on_message_edit(self, before: discord.Message, after: discord.Message):
+        if not ticket_index.is_open(after.channel.id):
+            return
+        if before.content == after.content:
+            return  # embed unfurls, attachment removals etc.
+        try:
+            await update_ticket_message(after)
+        except Exception as e:
+            logging.error(f"Failed to update ticket message {after.id}: {e}")
 
     @app_commands.command(name="setup_tickets", description="Force recreate the ticket panel.")
     @app_commands.describe(channel="Channel to post the panel in (default: current channel)")
@@ -290,32 +1173,115 @@ class Tickets(commands.Cog):
     async def set_ticket_log_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         await interaction.response.defer(ephemeral=True)
         try:
-            await db.execute(
-                "INSERT INTO guild_settings (guild_id, ticket_transcript_channel_id) VALUES (%s, %s) ON DUPLICATE KEY UPDATE ticket_transcript_channel_id = %s",
-                (interaction.guild.id, channel.id, channel.id)
-            )
+            await guild_settings.set(interaction.guild.id, "ticket_transcript_channel_id", channel.id)
             await interaction.followup.send(f"✅ Ticket transcripts will be sent to {channel.mention}.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Error saving setting: {e}", ephemeral=True)
 
-    @tasks.loop(minutes=10)
-    async def check_ticket_reminders(self):
-        # Scan open tickets > 24h
-        query = "SELECT channel_id, created_at FROM tickets WHERE status = 'open' AND reminded_24h = FALSE"
-        rows = await db.fetchall(query)
-        now = datetime.datetime.now()
-        
-        for row in rows:
-            created = row['created_at']
-            if (now - created).total_seconds() > 86400: # 24h
-                channel = self.bot.get_channel(row['channel_id'])
-                if channel:
-                    await channel.send("⏳ **Reminder:** Unclaimed for 24h.")
-                    await db.execute("UPDATE tickets SET reminded_24h = TRUE WHERE channel_id = %s", (row['channel_id'],))
+    @app_commands.command(name="ticket_dashboard", description="Post a live overview of open tickets.")
+    @app_commands.describe(channel="Channel to post the dashboard in (default: current channel)")
+    @app_commands.default_permissions(administrator=True)
+    async def ticket_dashboard(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
+        await interaction.response.defer(ephemeral=True)
+        target_channel = channel or interaction.channel
+        try:
+            message = await target_channel.send(embed=self.dashboard.render(interaction.guild.id))
+        except discord.Forbidden:
+            await interaction.followup.send(f"❌ Missing permissions to send messages in {target_channel.mention}.", ephemeral=True)
+            return
 
-    @check_ticket_reminders.before_loop
-    async def before_reminders(self):
-        await self.bot.wait_until_ready()
+        old = await guild_settings.get(interaction.guild.id)
+        try:
+            await guild_settings.set(interaction.guild.id, "ticket_dashboard_channel_id", target_channel.id)
+            await guild_settings.set(interaction.guild.id, "ticket_dashboard_message_id", message.id)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error saving setting: {e}", ephemeral=True)
+            return
+        if old.ticket_dashboard_message_id and old.ticket_dashboard_channel_id:
+            # Only one live dashboard per guild
+            old_channel = self.bot.get_channel(old.ticket_dashboard_channel_id)
+            if old_channel:
+                with contextlib.suppress(discord.HTTPException):
+                    await old_channel.get_partial_message(old.ticket_dashboard_message_id).delete()
+        await interaction.followup.send(f"✅ Ticket dashboard posted in {target_channel.mention}.", ephemeral=True)
+
+    @app_commands.command(name="ticket_stats", description="Ticket claim and resolution time percentiles.")
+    @app_commands.describe(category="Only this category (default: all)")
+    @app_commands.choices(category=[app_commands.Choice(name=d["label"], value=k) for k, d in TICKET_CATEGORIES.items()])
+    @app_commands.default_permissions(administrator=True)
+    async def ticket_stats(self, interaction: discord.Interaction, category: Optional[app_commands.Choice[str]] = None):
+        categories = [category.value] if category else list(TICKET_CATEGORIES)
+        embed = discord.Embed(title="📊 Ticket Stats", color=COLOR_GOLD)
+        if not category:
+            categories.insert(0, None)  # all categories combined first
+
+        for cat in categories:
+            summary = self.stats.summary(interaction.guild.id, cat)
+            lines = []
+            for metric, label in LIFECYCLE_METRICS.items():
+                sketch = summary.get(metric)
+                if not sketch or not sketch.count:
+                    continue
+                pcts = " · ".join(f"p{int(q * 100)} **{format_duration(sketch.quantile(q))}**" for q in STATS_QUANTILES)
+                lines.append(f"{label}: {pcts} (n={sketch.count})")
+            name = TICKET_CATEGORIES[cat]["label"] if cat else "All categories"
+            embed.add_field(name=name, value="\n".join(lines) or "No data yet.", inline=False)
+
+        embed.set_footer(text=f"Time from ticket creation · closed in the last {TICKET_STATS_DAYS} days (as of last restart) plus live data")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="ticket_leaderboard", description="Top ticket handlers by rating.")
+    @app_commands.describe(min_ratings="Ratings needed to be ranked")
+    @app_commands.default_permissions(administrator=True)
+    async def ticket_leaderboard(self, interaction: discord.Interaction, min_ratings: app_commands.Range[int, 1, 1000] = RATING_LEADERBOARD_MIN):
+        await interaction.response.defer(ephemeral=True)
+        rows = await db.fetchall(
+            "SELECT handler_id, rating_count, rating_sum, stars_1, stars_2, stars_3, stars_4, stars_5 FROM handler_rating_stats "
+            "WHERE guild_id = %s AND rating_count >= %s ORDER BY rating_sum * 1.0 / rating_count DESC, rating_count DESC LIMIT 10",
+            (interaction.guild.id, min_ratings)
+        )
+        if not rows:
+            await interaction.followup.send(f"🏆 No handler has {min_ratings}+ ratings yet.", ephemeral=True)
+            return
+
+        medals = ["🥇", "🥈", "🥉"]
+        lines = []
+        for i, row in enumerate(rows):
+            rank = medals[i] if i < len(medals) else f"**{i + 1}.**"
+            spread = " · ".join(f"{n}★ {row[f'stars_{n}']}" for n in range(5, 0, -1))
+            lines.append(f"{rank} <@{row['handler_id']}> — **{row['rating_sum'] / row['rating_count']:.2f}** ⭐ ({row['rating_count']} ratings)\n-# {spread}")
+
+        embed = discord.Embed(title="🏆 Ticket Handler Leaderboard", description="\n".join(lines), color=COLOR_GOLD)
+        embed.set_footer(text=f"Minimum {min_ratings} ratings")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="ticket_search", description="Search closed ticket transcripts.")
+    @app_commands.describe(query="Words to look for (all must match)")
+    @app_commands.default_permissions(administrator=True)
+    async def ticket_search(self, interaction: discord.Interaction, query: str):
+        await interaction.response.defer(ephemeral=True)
+        terms = re.findall(r"\w+", query)[:SEARCH_MAX_TERMS]
+        if not terms:
+            await interaction.followup.send("❌ Enter at least one word to search for.", ephemeral=True)
+            return
+
+        rows = await search_ticket_messages(interaction.guild.id, terms)
+        if not rows:
+            await interaction.followup.send(f"🔍 No closed tickets mention `{' '.join(terms)}`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=f"🔍 Ticket search: {' '.join(terms)}", color=COLOR_GOLD)
+        for row in rows:
+            when = row['created_at'].astimezone()  # naive local -> aware
+            category = TICKET_CATEGORIES.get(row['category'], {}).get("label", row['category'])
+            more = f" · {row['matches']} matches" if row['matches'] > 1 else ""
+            embed.add_field(
+                name=f"#{row['channel_name'] or 'unknown'} · {row['author_name']}",
+                value=f"{make_snippet(row['content'] or '', terms)}\n-# {category} · {discord.utils.format_dt(when, 'd')}{more}",
+                inline=False
+            )
+        embed.set_footer(text=f"Newest {len(rows)} matching tickets")
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(Tickets(bot))
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from database.db import db
+from database.db import db, ROWS_TUPLE, ROWS_RECORD
 from typing import Literal, Optional
 
 # Game role IDs
@@ -66,7 +66,8 @@ class VerificationPanel(discord.ui.View):
         """Show team selection for the specified game."""
         teams = await db.fetchall(
             "SELECT id, team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)",
-            (game,)
+            (game,),
+            row_mode=ROWS_RECORD
         )
         
         if not teams:
@@ -114,7 +115,8 @@ class VerificationPanel(discord.ui.View):
                JOIN teams t ON pr.team_id = t.id
                WHERE pr.discord_id = %s
                ORDER BY t.game_name""",
-            (interaction.user.id,)
+            (interaction.user.id,),
+            primary=True  # Status is often checked right after registering
         )
         
         if not registrations:
@@ -263,7 +265,8 @@ class IGNModal(discord.ui.Modal):
             """SELECT t.game_name, pr.ign FROM player_registrations pr
                JOIN teams t ON pr.team_id = t.id
                WHERE pr.discord_id = %s AND t.game_name != %s""",
-            (interaction.user.id, self.game)
+            (interaction.user.id, self.game),
+            primary=True
         )
         
         # Remove existing registration for THIS game
@@ -548,7 +551,8 @@ class Verification(commands.Cog):
                JOIN teams t ON pr.team_id = t.id
                WHERE pr.discord_id = %s
                ORDER BY t.game_name""",
-            (interaction.user.id,)
+            (interaction.user.id,),
+            primary=True  # Status is often checked right after registering
         )
         
         if not registrations:
@@ -589,7 +593,7 @@ class Verification(commands.Cog):
     @app_commands.describe(game="The game")
     @app_commands.checks.has_permissions(administrator=True)
     async def teams_remove(self, interaction: discord.Interaction, game: Literal["MLBB", "CODM"]):
-        teams = await db.fetchall("SELECT id, team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)", (game,))
+        teams = await db.fetchall("SELECT id, team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)", (game,), row_mode=ROWS_RECORD)
         if not teams:
             await interaction.response.send_message(f"❌ No teams for **{game}**.", ephemeral=True)
             return
@@ -764,12 +768,14 @@ class Verification(commands.Cog):
         
         teams = await db.fetchall(
             "SELECT team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)", 
-            (game,)
+            (game,),
+            row_mode=ROWS_TUPLE
         )
+        current = current.lower()
         return [
-            app_commands.Choice(name=t["team_name"][:100], value=t["team_name"][:100]) 
-            for t in teams 
-            if current.lower() in t["team_name"].lower()
+            app_commands.Choice(name=name[:100], value=name[:100]) 
+            for (name,) in teams 
+            if current in name.lower()
         ][:25]
     
     @roster.autocomplete("team_name")
@@ -785,12 +791,14 @@ class Verification(commands.Cog):
         
         teams = await db.fetchall(
             "SELECT team_name FROM teams WHERE game_name = %s ORDER BY LOWER(team_name)", 
-            (game,)
+            (game,),
+            row_mode=ROWS_TUPLE
         )
+        current = current.lower()
         return [
-            app_commands.Choice(name=t["team_name"][:100], value=t["team_name"][:100]) 
-            for t in teams 
-            if current.lower() in t["team_name"].lower()
+            app_commands.Choice(name=name[:100], value=name[:100]) 
+            for (name,) in teams 
+            if current in name.lower()
         ][:25]
 
 
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Convert ticket_messages.created_at/edited_at from UTC to server local time on remote DB.
+
+Every other DATETIME column (tickets.created_at, closed_at, ...) holds naive local time.
+The true creation time is encoded in each message_id snowflake, so a row is converted
+only while its created_at doesn't match it yet; running the script twice is harmless.
+"""
+import asyncio
+import os
+from dotenv import load_dotenv
+import aiomysql
+import discord
+
+load_dotenv()
+
+BATCH_SIZE = 1000
+
+def local_naive(dt):
+    return dt.astimezone().replace(tzinfo=None)
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+        autocommit=True,
+    )
+
+    last_id, converted = 0, 0
+    async with conn.cursor() as cur:
+        while True:
+            await cur.execute(
+                "SELECT message_id, created_at, edited_at FROM ticket_messages WHERE message_id > %s ORDER BY message_id LIMIT %s",
+                (last_id, BATCH_SIZE)
+            )
+            rows = await cur.fetchall()
+            if not rows:
+                break
+            updates = []
+            for message_id, created_at, edited_at in rows:
+                created = discord.utils.snowflake_time(message_id)
+                local = local_naive(created)
+                if created_at is None or abs((created_at - local).total_seconds()) < 1:
+                    continue  # already local
+                offset = local - created.replace(tzinfo=None)
+                updates.append((local, edited_at + offset if edited_at else None, message_id))
+            if updates:
+                await cur.executemany("UPDATE ticket_messages SET created_at = %s, edited_at = %s WHERE message_id = %s", updates)
+                converted += len(updates)
+            last_id = rows[-1][0]
+    print(f"✅ Converted {converted} ticket messages to local time")
+
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,75 +1,582 @@
 import aiomysql
 import os
+import re
 import asyncio
 import logging
+import datetime
+import sqlite3
+import pymysql
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class Database:
+# --- Row modes ---
+# ROWS_DICT is the default for every query. Hot paths that read a handful of columns
+# from many rows can opt into ROWS_TUPLE (plain tuples, positional access) or
+# ROWS_RECORD (slotted tuples that still support row['col'] / row.col lookups).
+ROWS_DICT = "dict"
+ROWS_TUPLE = "tuple"
+ROWS_RECORD = "record"
+
+class Record(tuple):
+    """Compact row: a tuple with a column mapping shared by every row of the same shape."""
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self._index[key]
+        return tuple.__getitem__(self, key)
+
+    def __getattr__(self, name):
+        try:
+            return tuple.__getitem__(self, self._index[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def get(self, key, default=None):
+        idx = self._index.get(key)
+        return default if idx is None else tuple.__getitem__(self, idx)
+
+    def keys(self):
+        return self._fields
+
+    def __repr__(self):
+        return "Record(" + ", ".join(f"{k}={v!r}" for k, v in zip(self._fields, self)) + ")"
+
+@lru_cache(maxsize=256)
+def record_class(columns):
+    """Returns the (cached) Record subclass for a tuple of column names."""
+    return type("Record", (Record,), {"__slots__": (), "_fields": columns, "_index": {c: i for i, c in enumerate(columns)}})
+
+def shape_rows(description, rows, row_mode):
+    """Converts raw tuple rows into the requested row mode."""
+    if row_mode == ROWS_TUPLE:
+        return rows
+    columns = tuple(col[0] for col in description)
+    if row_mode == ROWS_RECORD:
+        cls = record_class(columns)
+        return [cls(r) for r in rows]
+    return [dict(zip(columns, r)) for r in rows]
+
+# --- MySQL -> SQLite query translation ---
+# Only the MySQL-isms actually used by the cogs are handled here.
+_PARAM_RE = re.compile(r"%s")
+_ON_DUPLICATE_RE = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE", re.IGNORECASE)
+_VALUES_FUNC_RE = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+_NOW_RE = re.compile(r"\bNOW\(\)", re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.IGNORECASE)
+_DELETE_JOIN_RE = re.compile(
+    r"^\s*DELETE\s+(?P<alias>\w+)\s+FROM\s+(?P<table>\w+)\s+(?P=alias)\s+(?P<rest>JOIN\s.*)$",
+    re.IGNORECASE | re.DOTALL
+)
+
+def translate_mysql_to_sqlite(query: str) -> str:
+    """Rewrites a MySQL query (as written in the cogs) into SQLite syntax."""
+    # DELETE pr FROM player_registrations pr JOIN ... WHERE ...
+    # -> DELETE FROM player_registrations WHERE id IN (SELECT pr.id FROM ... JOIN ... WHERE ...)
+    m = _DELETE_JOIN_RE.match(query)
+    if m:
+        alias, table, rest = m.group("alias"), m.group("table"), m.group("rest")
+        query = f"DELETE FROM {table} WHERE id IN (SELECT {alias}.id FROM {table} {alias} {rest})"
+
+    # INSERT ... ON DUPLICATE KEY UPDATE col = %s  -> INSERT ... ON CONFLICT DO UPDATE SET col = ?
+    if _ON_DUPLICATE_RE.search(query):
+        query = _ON_DUPLICATE_RE.sub("ON CONFLICT DO UPDATE SET", query)
+        query = _VALUES_FUNC_RE.sub(r"excluded.\1", query)
+
+    # INSERT IGNORE INTO ...  -> INSERT OR IGNORE INTO ...
+    query = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", query)
+    query = _NOW_RE.sub("datetime('now', 'localtime')", query)
+    return _PARAM_RE.sub("?", query)
+
+def _adapt_datetime(value: datetime.datetime) -> str:
+    return value.isoformat(" ")
+
+def _convert_datetime(value: bytes) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.decode())
+
+sqlite3.register_adapter(datetime.datetime, _adapt_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+class Replica:
+    """A read replica pool plus its last observed health."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.pool = None
+        self.healthy = False
+        self.lag = None
+
+    def __repr__(self):
+        return f"{self.host}:{self.port}"
+
+
+def _parse_hosts(value, default_port):
+    hosts = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        hosts.append((host, int(port or default_port)))
+    return hosts
+
+
+class MySQLBackend:
+    """aiomysql connection pool (production default).
+
+    Optional read replicas (DB_REPLICA_HOSTS="host1,host2:3307") get their own pools.
+    fetchrow/fetchall go to a healthy replica unless primary=True is passed; replicas
+    lagging more than DB_REPLICA_MAX_LAG seconds, or failing, fall back to the primary.
+    """
+    name = "mysql"
+    schema_path = "database/schema.sql"
+
     def __init__(self):
         self.pool = None
+        port = int(os.getenv("DB_PORT", 3306))
+        self.replicas = [Replica(h, p) for h, p in _parse_hosts(os.getenv("DB_REPLICA_HOSTS"), port)]
+        self.max_replica_lag = float(os.getenv("DB_REPLICA_MAX_LAG", 5))
+        self.lag_check_interval = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 5))
+        self._replica_cursor = 0
+        self._lag_task = None
+
+    async def _create_pool(self, host, port, **kwargs):
+        return await aiomysql.create_pool(
+            host=host,
+            port=port,
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            db=os.getenv("DB_NAME", "isfe_bot_db"),
+            autocommit=True,
+            cursorclass=aiomysql.DictCursor,
+            **kwargs
+        )
+
+    async def connect(self):
+        self.pool = await self._create_pool(os.getenv("DB_HOST", "localhost"), int(os.getenv("DB_PORT", 3306)))
+        for replica in self.replicas:
+            try:
+                replica.pool = await self._create_pool(replica.host, replica.port, connect_timeout=5)
+                await self._check_replica(replica)
+            except Exception as e:
+                replica.healthy = False
+                logging.warning(f"Read replica {replica} unavailable, reads will use the primary: {e}")
+        if self.replicas and self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._monitor_replicas())
+
+    @property
+    def connected(self):
+        return self.pool is not None
+
+    async def _close_replicas(self, terminate=False):
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        for replica in self.replicas:
+            if replica.pool and terminate:
+                replica.pool.terminate()
+            elif replica.pool:
+                replica.pool.close()
+                await replica.pool.wait_closed()
+            replica.pool = None
+            replica.healthy = False
+
+    async def close(self):
+        await self._close_replicas()
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def reset(self):
+        """Drops every pooled connection without waiting for in-flight queries."""
+        await self._close_replicas(terminate=True)
+        if self.pool:
+            self.pool.terminate()
+            self.pool = None
+
+    def is_disconnect(self, error):
+        # 2003/2006/2013 etc. surface as OperationalError/InterfaceError; raw socket errors as OSError
+        return isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError, OSError))
+
+    # --- Replica health ---
+
+    async def _check_replica(self, replica):
+        """Reads replication lag; a stopped or lagging replica is taken out of rotation."""
+        if not replica.pool:
+            replica.pool = await self._create_pool(replica.host, replica.port, connect_timeout=5)
+        async with replica.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    await cur.execute("SHOW REPLICA STATUS")
+                except pymysql.err.ProgrammingError:  # MySQL < 8.0.22 / MariaDB < 10.5
+                    await cur.execute("SHOW SLAVE STATUS")
+                status = await cur.fetchone() or {}
+                # MariaDB 10.5+ accepts SHOW REPLICA STATUS but keeps the _Master column name
+                lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+
+        replica.lag = lag
+        was_healthy = replica.healthy
+        replica.healthy = lag is not None and lag <= self.max_replica_lag
+        if was_healthy and not replica.healthy:
+            logging.warning(f"Read replica {replica} out of rotation (lag: {lag}).")
+        elif replica.healthy and not was_healthy:
+            logging.info(f"✅ Read replica {replica} back in rotation (lag: {lag}s).")
+
+    async def _monitor_replicas(self):
+        while True:
+            await asyncio.sleep(self.lag_check_interval)
+            for replica in self.replicas:
+                try:
+                    await asyncio.wait_for(self._check_replica(replica), timeout=self.lag_check_interval)
+                except Exception as e:
+                    if replica.healthy:
+                        logging.warning(f"Read replica {replica} out of rotation: {e}")
+                    replica.healthy = False
+
+    def _pick_replica(self):
+        """Round-robins over healthy replicas; None means read from the primary."""
+        healthy = [r for r in self.replicas if r.healthy and r.pool]
+        if not healthy:
+            return None
+        self._replica_cursor = (self._replica_cursor + 1) % len(healthy)
+        return healthy[self._replica_cursor]
+
+    @asynccontextmanager
+    async def _cursor(self, cursor_class=None, pool=None):
+        async with (pool or self.pool).acquire() as conn:
+            try:
+                async with conn.cursor(cursor_class) if cursor_class else conn.cursor() as cur:
+                    yield cur
+            except asyncio.CancelledError:
+                # Timed out mid-query: the connection's protocol state is unknown, so
+                # close it instead of handing it back to the pool.
+                conn.close()
+                raise
+
+    async def _read(self, query, params, row_mode, one, primary):
+        replica = None if primary else self._pick_replica()
+        if replica:
+            try:
+                return await self._fetch(query, params, row_mode, one, replica.pool)
+            except Exception as e:
+                if not self.is_disconnect(e):
+                    raise
+                replica.healthy = False
+                logging.warning(f"Read replica {replica} failed, falling back to primary: {e}")
+        return await self._fetch(query, params, row_mode, one, self.pool)
+
+    async def _fetch(self, query, params, row_mode, one, pool):
+        if row_mode == ROWS_DICT:
+            async with self._cursor(pool=pool) as cur:
+                await cur.execute(query, params)
+                return await (cur.fetchone() if one else cur.fetchall())
+        async with self._cursor(aiomysql.Cursor, pool=pool) as cur:
+            await cur.execute(query, params)
+            if one:
+                row = await cur.fetchone()
+                return shape_rows(cur.description, [row], row_mode)[0] if row else None
+            return shape_rows(cur.description, await cur.fetchall(), row_mode)
+
+    async def execute(self, query, params=None):
+        async with self._cursor() as cur:
+            await cur.execute(query, params)
+            return cur.rowcount, cur.lastrowid
+
+    async def fetchrow(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        return await self._read(query, params, row_mode, True, primary)
+
+    async def fetchall(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        return await self._read(query, params, row_mode, False, primary)
+
+    async def run_statements(self, statements):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for statement in statements:
+                    try:
+                        await cur.execute(statement)
+                    except Exception as e:
+                        print(f"Error executing schema statement: {e}")
+
+
+class SQLiteBackend:
+    """Embedded aiosqlite database for local development, CI and single-node deployments.
+
+    A single connection is reused for the lifetime of the bot (aiosqlite serialises
+    access on its worker thread) and the database runs in WAL mode so reads don't
+    block behind writes.
+    """
+    name = "sqlite"
+    schema_path = "database/schema_sqlite.sql"
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("DB_PATH", "data/isfe_bot.db")
+        self.conn = None
+        self.locked_retries = 4
+
+    async def connect(self):
+        import aiosqlite  # Optional dependency, only needed for DB_BACKEND=sqlite
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = await aiosqlite.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None)
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA foreign_keys=ON")
+        await self.conn.execute("PRAGMA busy_timeout=5000")
+
+    @property
+    def connected(self):
+        return self.conn is not None
+
+    async def close(self):
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+
+    async def reset(self):
+        try:
+            await self.close()
+        except Exception:
+            pass
+        self.conn = None
+
+    def is_disconnect(self, error):
+        if isinstance(error, ValueError):  # aiosqlite: "no active connection"
+            return True
+        return isinstance(error, sqlite3.OperationalError) and any(
+            msg in str(error) for msg in ("unable to open", "disk I/O")
+        )
+
+    async def _retry_locked(self, call):
+        """Retries a statement that failed with "database is locked". busy_timeout already
+        waits for ordinary lock holders; this covers the cases SQLite fails immediately
+        (e.g. a WAL snapshot conflict). The connection itself is fine, so it is kept."""
+        for attempt in range(self.locked_retries):
+            try:
+                return await call()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == self.locked_retries - 1:
+                    raise
+                await asyncio.sleep(0.05 * 2 ** attempt)
+
+    @asynccontextmanager
+    async def _cursor(self):
+        async with self.conn.cursor() as cur:
+            cur.row_factory = None
+            try:
+                yield cur
+            except asyncio.CancelledError:
+                await self.conn.interrupt()  # Abort the statement running on the worker thread
+                raise
+
+    async def execute(self, query, params=None):
+        async def run():
+            async with self._cursor() as cur:
+                await cur.execute(translate_mysql_to_sqlite(query), params or ())
+                return cur.rowcount, cur.lastrowid
+        return await self._retry_locked(run)
+
+    async def fetchrow(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        # Single node: primary is accepted for interface compatibility only
+        async def run():
+            async with self._cursor() as cur:
+                await cur.execute(translate_mysql_to_sqlite(query), params or ())
+                row = await cur.fetchone()
+                return shape_rows(cur.description, [row], row_mode)[0] if row else None
+        return await self._retry_locked(run)
+
+    async def fetchall(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        async def run():
+            async with self._cursor() as cur:
+                await cur.execute(translate_mysql_to_sqlite(query), params or ())
+                return shape_rows(cur.description, await cur.fetchall(), row_mode)
+        return await self._retry_locked(run)
+
+    async def run_statements(self, statements):
+        for statement in statements:
+            try:
+                await self.conn.execute(statement)
+            except Exception as e:
+                print(f"Error executing schema statement: {e}")
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+def create_backend(name=None):
+    """Builds the backend selected by DB_BACKEND (default: mysql)."""
+    name = (name or os.getenv("DB_BACKEND", "mysql")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+class DatabaseUnavailable(Exception):
+    """Raised when a query is attempted while the database connection is down."""
+
+
+class Database:
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self.query_timeout = float(os.getenv("DB_QUERY_TIMEOUT", 10))
+        self.reconnect_base_delay = 1.0
+        self.reconnect_max_delay = 60.0
+
+        # Outage handling: writes flagged queue_on_failure are held here (oldest dropped
+        # first when full) and replayed in order once the connection is back.
+        self.available = True
+        self.pending_writes = deque()
+        self.max_pending_writes = int(os.getenv("DB_WRITE_QUEUE_SIZE", 1000))
+        self.stats = {"queued": 0, "replayed": 0, "dropped": 0, "timeouts": 0, "reconnects": 0}
+        self._reconnect_task = None
 
     async def connect(self):
         """Initializes the connection pool."""
         try:
-            self.pool = await aiomysql.create_pool(
-                host=os.getenv("DB_HOST", "localhost"),
-                port=int(os.getenv("DB_PORT", 3306)),
-                user=os.getenv("DB_USER", "root"),
-                password=os.getenv("DB_PASSWORD", ""),
-                db=os.getenv("DB_NAME", "isfe_bot_db"),
-                autocommit=True,
-                cursorclass=aiomysql.DictCursor
-            )
-            logging.info("✅ Database connection established.")
-            
+            await self.backend.connect()
+            logging.info(f"✅ Database connection established ({self.backend.name}).")
+
             # Auto-run local init if needed (optional, simplistic migration)
-            # await self.initialize_schema() 
+            # await self.initialize_schema()
         except Exception as e:
             logging.error(f"❌ Failed to connect to database: {e}")
             raise e
 
     async def close(self):
         """Closes the connection pool."""
-        if self.pool:
-            self.pool.close()
-            await self.pool.wait_closed()
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self.pending_writes:
+            logging.warning(f"Closing database with {len(self.pending_writes)} unsent queued writes.")
+        if self.backend.connected:
+            await self.backend.close()
             logging.info("Database connection closed.")
 
-    async def execute(self, query, params=None):
+    # --- Outage handling ---
+
+    def _mark_unavailable(self, error):
+        if self.available:
+            logging.error(f"❌ Database connection lost: {error}")
+        self.available = False
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        """Reconnects with exponential backoff, then replays queued writes."""
+        delay = self.reconnect_base_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.backend.reset()
+                await self.backend.connect()
+                await asyncio.wait_for(self.backend.fetchrow("SELECT 1"), timeout=self.query_timeout)
+                await self._replay_pending_writes()
+            except Exception as e:
+                delay = min(delay * 2, self.reconnect_max_delay)
+                logging.warning(f"Database reconnect failed ({e}), retrying in {delay:.0f}s.")
+                continue
+
+            self.available = True
+            self._reconnect_task = None
+            self.stats["reconnects"] += 1
+            logging.info(f"✅ Database reconnected. Write queue stats: {self.stats}")
+            return
+
+    async def _replay_pending_writes(self):
+        while self.pending_writes:
+            query, params = self.pending_writes[0]
+            try:
+                await asyncio.wait_for(self.backend.execute(query, params), timeout=self.query_timeout)
+            except Exception as e:
+                if self.backend.is_disconnect(e) or isinstance(e, asyncio.TimeoutError):
+                    raise  # Still down; keep the write at the head of the queue
+                logging.error(f"Dropping queued write that failed on replay: {e}")
+                self.stats["dropped"] += 1
+            else:
+                self.stats["replayed"] += 1
+            self.pending_writes.popleft()
+
+    def _queue_write(self, query, params):
+        if len(self.pending_writes) >= self.max_pending_writes:
+            self.pending_writes.popleft()
+            self.stats["dropped"] += 1
+            logging.warning("Database write queue full, dropped the oldest queued write.")
+        self.pending_writes.append((query, params))
+        self.stats["queued"] += 1
+
+    async def _run(self, call):
+        """Runs a backend call with the per-query timeout, tracking connection loss."""
+        if not self.backend.connected and self._reconnect_task is None:
+            try:
+                await self.connect()
+            except Exception as e:
+                # Same as losing the connection later: back off in the background
+                self._mark_unavailable(e)
+                raise DatabaseUnavailable(str(e)) from e
+        if not self.available:
+            raise DatabaseUnavailable("Database is reconnecting.")
+        try:
+            # wait_for cancels the query on timeout; backends clean up the connection
+            return await asyncio.wait_for(call(), timeout=self.query_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception as e:
+            if self.backend.is_disconnect(e):
+                self._mark_unavailable(e)
+                raise DatabaseUnavailable(str(e)) from e
+            raise
+
+    # --- Queries ---
+
+    async def execute(self, query, params=None, queue_on_failure=False):
         """Executes a modification query (INSERT, UPDATE, DELETE).
-        Returns lastrowid for INSERT, rowcount for UPDATE/DELETE."""
-        if not self.pool:
-            await self.connect()
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(query, params)
-                # Return rowcount for DELETE/UPDATE, lastrowid for INSERT
-                if query.strip().upper().startswith(("DELETE", "UPDATE")):
-                    return cur.rowcount
-                return cur.lastrowid
-
-    async def fetchrow(self, query, params=None):
-        """Fetches a single row."""
-        if not self.pool:
-            await self.connect()
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(query, params)
-                return await cur.fetchone()
+        Returns lastrowid for INSERT, rowcount for UPDATE/DELETE.
 
-    async def fetchall(self, query, params=None):
-        """Fetches all rows."""
-        if not self.pool:
-            await self.connect()
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(query, params)
-                return await cur.fetchall()
+        With queue_on_failure=True the write is queued (and None returned) instead of
+        raising while the database is down or stalled past the query timeout; use it for
+        fire-and-forget writes only. A timed-out write may still have been applied, so a
+        queued write can run twice."""
+        try:
+            rowcount, lastrowid = await self._run(lambda: self.backend.execute(query, params))
+        except (DatabaseUnavailable, asyncio.TimeoutError) as e:
+            if not queue_on_failure:
+                raise
+            if isinstance(e, asyncio.TimeoutError):
+                # Treat a stall like a lost connection so the reconnect loop replays the queue
+                self._mark_unavailable(f"write timed out after {self.query_timeout:g}s")
+            self._queue_write(query, params)
+            return None
+        # Return rowcount for DELETE/UPDATE, lastrowid for INSERT
+        if query.strip().upper().startswith(("DELETE", "UPDATE")):
+            return rowcount
+        return lastrowid
+
+    async def fetchrow(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        """Fetches a single row (dict by default, see ROWS_* for compact modes).
+        Reads may be served by a replica; pass primary=True to read your own writes."""
+        return await self._run(lambda: self.backend.fetchrow(query, params, row_mode, primary))
+
+    async def fetchall(self, query, params=None, row_mode=ROWS_DICT, primary=False):
+        """Fetches all rows (dicts by default, see ROWS_* for compact modes).
+        Reads may be served by a replica; pass primary=True to read your own writes."""
+        return await self._run(lambda: self.backend.fetchall(query, params, row_mode, primary))
 
-    async def initialize_schema(self, schema_path="database/schema.sql"):
-        """Runs the schema.sql file to create tables."""
+    async def initialize_schema(self, schema_path=None):
+        """Runs the backend's schema file to create tables."""
+        schema_path = schema_path or self.backend.schema_path
         if not os.path.exists(schema_path):
             logging.warning(f"Schema file {schema_path} not found.")
             return
@@ -77,15 +584,9 @@ class Database:
         with open(schema_path, "r") as f:
             schema = f.read()
 
-        # Split by semicolon to execute individual statements
+        # Strip comment lines, then split by semicolon to execute individual statements
+        schema = "\n".join(line for line in schema.splitlines() if not line.strip().startswith("--"))
         statements = [s.strip() for s in schema.split(";") if s.strip()]
-        
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                for statement in statements:
-                    try:
-                        await cur.execute(statement)
-                    except Exception as e:
-                        print(f"Error executing schema statement: {e}")
+        await self.backend.run_statements(statements)
 
 db = Database()
@@ -0,0 +1,63 @@
+import logging
+from dataclasses import dataclass, replace
+from typing import Optional
+from database.db import db
+
+@dataclass(frozen=True)
+class GuildSettings:
+    guild_id: int
+    log_channel_id: Optional[int] = None
+    ticket_category_id: Optional[int] = None
+    ticket_transcript_channel_id: Optional[int] = None
+    embed_log_channel_id: Optional[int] = None
+    ticket_dashboard_channel_id: Optional[int] = None
+    ticket_dashboard_message_id: Optional[int] = None
+
+SETTING_COLUMNS = ("log_channel_id", "ticket_category_id", "ticket_transcript_channel_id", "embed_log_channel_id", "ticket_dashboard_channel_id", "ticket_dashboard_message_id")
+
+class GuildSettingsCache:
+    """Read-through cache of guild_settings.
+
+    The whole table (one row per guild) is loaded at startup. Every write goes
+    through set(), which updates the DB and the cached entry together, so hot
+    paths can call get() without touching the database.
+    """
+
+    def __init__(self):
+        self._settings: dict[int, GuildSettings] = {}
+        self.loaded = False
+
+    async def load(self):
+        rows = await db.fetchall(f"SELECT guild_id, {', '.join(SETTING_COLUMNS)} FROM guild_settings")
+        self._settings = {row['guild_id']: GuildSettings(**row) for row in rows}
+        self.loaded = True
+        logging.info(f"Loaded settings for {len(self._settings)} guild(s).")
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        settings = self._settings.get(guild_id)
+        if settings is None and not self.loaded:
+            # Startup load failed (e.g. DB outage); fall back to reading through
+            row = await db.fetchrow(f"SELECT guild_id, {', '.join(SETTING_COLUMNS)} FROM guild_settings WHERE guild_id = %s", (guild_id,))
+            if row:
+                settings = self._settings[guild_id] = GuildSettings(**row)
+        return settings or GuildSettings(guild_id=guild_id)
+
+    async def set(self, guild_id: int, column: str, value: Optional[int]) -> GuildSettings:
+        """Upserts one setting and updates the cache."""
+        if column not in SETTING_COLUMNS:
+            raise ValueError(f"Unknown guild setting '{column}'")
+        await db.execute(
+            f"INSERT INTO guild_settings (guild_id, {column}) VALUES (%s, %s) ON DUPLICATE KEY UPDATE {column} = %s",
+            (guild_id, value, value)
+        )
+        current = self._settings.get(guild_id)
+        if current is None and not self.loaded:
+            # Not loaded, so the other columns are unknown: cache the full row, not a partial one
+            row = await db.fetchrow(f"SELECT guild_id, {', '.join(SETTING_COLUMNS)} FROM guild_settings WHERE guild_id = %s", (guild_id,), primary=True)
+            if row:
+                self._settings[guild_id] = GuildSettings(**row)
+                return self._settings[guild_id]
+        self._settings[guild_id] = replace(current or GuildSettings(guild_id=guild_id), **{column: value})
+        return self._settings[guild_id]
+
+guild_settings = GuildSettingsCache()
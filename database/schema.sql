@@ -3,7 +3,9 @@ CREATE TABLE IF NOT EXISTS guild_settings (
     log_channel_id BIGINT NULL,
     ticket_category_id BIGINT NULL,
     ticket_transcript_channel_id BIGINT NULL,
-    embed_log_channel_id BIGINT NULL
+    embed_log_channel_id BIGINT NULL,
+    ticket_dashboard_channel_id BIGINT NULL,
+    ticket_dashboard_message_id BIGINT NULL
 );
 
 CREATE TABLE IF NOT EXISTS command_logs (
@@ -12,8 +14,57 @@ CREATE TABLE IF NOT EXISTS command_logs (
     guild_id BIGINT,
     channel_id BIGINT,
     command_name VARCHAR(100),
+    args JSON,
+    latency_ms INT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    -- Commonly filtered option values, extracted from args for indexing
+    arg_team_name VARCHAR(100) GENERATED ALWAYS AS (LEFT(JSON_UNQUOTE(JSON_EXTRACT(args, '$.team_name')), 100)) STORED,
+    arg_match_number BIGINT GENERATED ALWAYS AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(args, '$.match_number')) = 'INTEGER' THEN CAST(JSON_EXTRACT(args, '$.match_number') AS SIGNED) END) STORED,
+    INDEX idx_command_logs_team_name (arg_team_name),
+    INDEX idx_command_logs_match_number (command_name, arg_match_number)
+);
+
+-- Rows moved out of command_logs by the retention job (COMMAND_LOG_RETENTION_DAYS)
+CREATE TABLE IF NOT EXISTS command_logs_archive (
+    id INT PRIMARY KEY,
+    user_id BIGINT,
+    guild_id BIGINT,
+    channel_id BIGINT,
+    command_name VARCHAR(100),
     args TEXT,
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    latency_ms INT NULL,
+    timestamp DATETIME,
+    INDEX idx_command_logs_archive_timestamp (timestamp)
+);
+
+-- Hourly per-command usage, maintained from command_logs; analytics read this instead of raw rows
+CREATE TABLE IF NOT EXISTS command_usage_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL,
+    invocations INT NOT NULL DEFAULT 0,
+    distinct_users INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name),
+    INDEX idx_command_usage_hour (hour)
+);
+
+CREATE TABLE IF NOT EXISTS command_user_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL DEFAULT '',
+    user_id BIGINT NOT NULL,
+    invocations INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name, user_id)
+);
+
+-- Log-scale latency histogram per command and hour (see latency_bucket in cogs/admin_logs.py)
+CREATE TABLE IF NOT EXISTS command_latency_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL,
+    bucket SMALLINT NOT NULL,
+    samples INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name, bucket)
 );
 
 CREATE TABLE IF NOT EXISTS tickets (
@@ -27,7 +78,27 @@ CREATE TABLE IF NOT EXISTS tickets (
     claimed_by BIGINT NULL,
     is_test BOOLEAN DEFAULT FALSE,
     escalated_48h BOOLEAN DEFAULT FALSE,
-    reminded_24h BOOLEAN DEFAULT FALSE
+    reminded_24h BOOLEAN DEFAULT FALSE,
+    channel_name VARCHAR(100) NULL,
+    claimed_at DATETIME NULL,
+    first_staff_reply_at DATETIME NULL,
+    closed_at DATETIME NULL,
+    rated_at DATETIME NULL
+);
+
+CREATE TABLE IF NOT EXISTS ticket_messages (
+    message_id BIGINT PRIMARY KEY,
+    channel_id BIGINT NOT NULL,
+    author_id BIGINT,
+    author_name VARCHAR(100),
+    avatar_url VARCHAR(255),
+    is_bot BOOLEAN DEFAULT FALSE,
+    content TEXT,
+    attachments JSON,
+    created_at DATETIME,
+    edited_at DATETIME NULL,
+    INDEX idx_ticket_messages_channel (channel_id, created_at),
+    FULLTEXT INDEX ft_ticket_messages_content (content)
 );
 
 CREATE TABLE IF NOT EXISTS ticket_ratings (
@@ -37,7 +108,24 @@ CREATE TABLE IF NOT EXISTS ticket_ratings (
     handler_mention VARCHAR(100),
     stars INT,
     remarks TEXT,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    channel_id BIGINT NULL,
+    guild_id BIGINT NULL,
+    handler_id BIGINT NULL
+);
+
+-- Running per-handler rating totals, updated with each rating (leaderboards read only this)
+CREATE TABLE IF NOT EXISTS handler_rating_stats (
+    guild_id BIGINT,
+    handler_id BIGINT,
+    rating_count INT DEFAULT 0,
+    rating_sum INT DEFAULT 0,
+    stars_1 INT DEFAULT 0,
+    stars_2 INT DEFAULT 0,
+    stars_3 INT DEFAULT 0,
+    stars_4 INT DEFAULT 0,
+    stars_5 INT DEFAULT 0,
+    PRIMARY KEY (guild_id, handler_id)
 );
 
 CREATE TABLE IF NOT EXISTS reaction_roles (
@@ -84,4 +172,13 @@ CREATE TABLE IF NOT EXISTS player_registrations (
 -- Index for faster lookups by discord_id
 CREATE INDEX IF NOT EXISTS idx_registrations_discord ON player_registrations(discord_id);
 
+-- Hot query indexes (see add_hot_query_indexes.py for existing databases)
+CREATE INDEX IF NOT EXISTS idx_tickets_creator_status_category ON tickets(creator_id, status, category);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_reminded ON tickets(status, reminded_24h);
+CREATE INDEX IF NOT EXISTS idx_tickets_closed_at ON tickets(closed_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_status_time ON scheduled_embeds(status, schedule_for);
+CREATE INDEX IF NOT EXISTS idx_scheduled_user_status ON scheduled_embeds(user_id, status);
+CREATE INDEX IF NOT EXISTS idx_command_logs_timestamp ON command_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_command_logs_guild_timestamp ON command_logs(guild_id, timestamp);
+
 -- Unique constraint: one player per game (enforced in application logic since we need to join tables)
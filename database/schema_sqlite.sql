@@ -0,0 +1,186 @@
+-- SQLite mirror of schema.sql (used when DB_BACKEND=sqlite).
+-- Keep both files in sync when changing tables.
+
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id BIGINT PRIMARY KEY,
+    log_channel_id BIGINT NULL,
+    ticket_category_id BIGINT NULL,
+    ticket_transcript_channel_id BIGINT NULL,
+    embed_log_channel_id BIGINT NULL,
+    ticket_dashboard_channel_id BIGINT NULL,
+    ticket_dashboard_message_id BIGINT NULL
+);
+
+CREATE TABLE IF NOT EXISTS command_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id BIGINT,
+    guild_id BIGINT,
+    channel_id BIGINT,
+    command_name VARCHAR(100),
+    args TEXT,
+    latency_ms INT NULL,
+    timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
+    arg_team_name TEXT GENERATED ALWAYS AS (json_extract(args, '$.team_name')) VIRTUAL,
+    arg_match_number INT GENERATED ALWAYS AS (CASE WHEN json_type(args, '$.match_number') = 'integer' THEN json_extract(args, '$.match_number') END) VIRTUAL
+);
+
+CREATE TABLE IF NOT EXISTS command_logs_archive (
+    id INTEGER PRIMARY KEY,
+    user_id BIGINT,
+    guild_id BIGINT,
+    channel_id BIGINT,
+    command_name VARCHAR(100),
+    args TEXT,
+    latency_ms INT NULL,
+    timestamp DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS command_usage_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL,
+    invocations INT NOT NULL DEFAULT 0,
+    distinct_users INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name)
+);
+
+CREATE TABLE IF NOT EXISTS command_user_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL DEFAULT '',
+    user_id BIGINT NOT NULL,
+    invocations INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS command_latency_hourly (
+    guild_id BIGINT NOT NULL,
+    hour DATETIME NOT NULL,
+    command_name VARCHAR(100) NOT NULL,
+    bucket SMALLINT NOT NULL,
+    samples INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, hour, command_name, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id BIGINT UNIQUE,
+    guild_id BIGINT,
+    creator_id BIGINT,
+    category VARCHAR(50),
+    status TEXT CHECK (status IN ('open', 'closed')) DEFAULT 'open',
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    claimed_by BIGINT NULL,
+    is_test BOOLEAN DEFAULT FALSE,
+    escalated_48h BOOLEAN DEFAULT FALSE,
+    reminded_24h BOOLEAN DEFAULT FALSE,
+    channel_name VARCHAR(100) NULL,
+    claimed_at DATETIME NULL,
+    first_staff_reply_at DATETIME NULL,
+    closed_at DATETIME NULL,
+    rated_at DATETIME NULL
+);
+
+CREATE TABLE IF NOT EXISTS ticket_messages (
+    message_id BIGINT PRIMARY KEY,
+    channel_id BIGINT NOT NULL,
+    author_id BIGINT,
+    author_name VARCHAR(100),
+    avatar_url VARCHAR(255),
+    is_bot BOOLEAN DEFAULT FALSE,
+    content TEXT,
+    attachments TEXT,
+    created_at DATETIME,
+    edited_at DATETIME NULL
+);
+
+-- Full-text index over closed-ticket messages (MySQL uses FULLTEXT on ticket_messages.content).
+-- External content: rows are added when a ticket closes, see index_closed_ticket in cogs/tickets.py.
+CREATE VIRTUAL TABLE IF NOT EXISTS ticket_messages_fts USING fts5(content, content='ticket_messages', content_rowid='message_id');
+
+CREATE TABLE IF NOT EXISTS ticket_ratings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_name VARCHAR(100),
+    user_id BIGINT,
+    handler_mention VARCHAR(100),
+    stars INT,
+    remarks TEXT,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    channel_id BIGINT NULL,
+    guild_id BIGINT NULL,
+    handler_id BIGINT NULL
+);
+
+-- Running per-handler rating totals, updated with each rating (leaderboards read only this)
+CREATE TABLE IF NOT EXISTS handler_rating_stats (
+    guild_id BIGINT,
+    handler_id BIGINT,
+    rating_count INT DEFAULT 0,
+    rating_sum INT DEFAULT 0,
+    stars_1 INT DEFAULT 0,
+    stars_2 INT DEFAULT 0,
+    stars_3 INT DEFAULT 0,
+    stars_4 INT DEFAULT 0,
+    stars_5 INT DEFAULT 0,
+    PRIMARY KEY (guild_id, handler_id)
+);
+
+CREATE TABLE IF NOT EXISTS reaction_roles (
+    message_id BIGINT,
+    channel_id BIGINT,
+    guild_id BIGINT,
+    emoji VARCHAR(100),
+    role_id BIGINT,
+    PRIMARY KEY (message_id, emoji)
+);
+
+CREATE TABLE IF NOT EXISTS scheduled_embeds (
+    identifier VARCHAR(20) PRIMARY KEY,
+    channel_id BIGINT,
+    user_id BIGINT,
+    content TEXT,
+    embed_json TEXT,
+    schedule_for DATETIME,
+    status TEXT CHECK (status IN ('pending', 'sent', 'failed')) DEFAULT 'pending'
+);
+
+CREATE TABLE IF NOT EXISTS autocreate_configs (
+    voice_channel_id BIGINT PRIMARY KEY,
+    category_id BIGINT
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_name VARCHAR(20) NOT NULL,
+    team_name VARCHAR(100) NOT NULL,
+    UNIQUE (game_name, team_name)
+);
+
+CREATE TABLE IF NOT EXISTS player_registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    discord_id BIGINT NOT NULL,
+    team_id INT NOT NULL,
+    ign VARCHAR(50) NULL,
+    nickname_preference TEXT CHECK (nickname_preference IN ('this', 'other', 'combined', 'plain')) DEFAULT 'this',
+    registered_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_registrations_discord ON player_registrations(discord_id);
+
+-- Hot query indexes
+CREATE INDEX IF NOT EXISTS idx_tickets_creator_status_category ON tickets(creator_id, status, category);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_reminded ON tickets(status, reminded_24h);
+CREATE INDEX IF NOT EXISTS idx_tickets_closed_at ON tickets(closed_at);
+CREATE INDEX IF NOT EXISTS idx_ticket_messages_channel ON ticket_messages(channel_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_status_time ON scheduled_embeds(status, schedule_for);
+CREATE INDEX IF NOT EXISTS idx_scheduled_user_status ON scheduled_embeds(user_id, status);
+CREATE INDEX IF NOT EXISTS idx_command_logs_timestamp ON command_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_command_logs_guild_timestamp ON command_logs(guild_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_command_logs_team_name ON command_logs(arg_team_name);
+CREATE INDEX IF NOT EXISTS idx_command_logs_match_number ON command_logs(command_name, arg_match_number);
+CREATE INDEX IF NOT EXISTS idx_command_logs_archive_timestamp ON command_logs_archive(timestamp);
+CREATE INDEX IF NOT EXISTS idx_command_usage_hour ON command_usage_hourly(hour);
+
+-- MySQL indexes foreign keys implicitly, SQLite does not
+CREATE INDEX IF NOT EXISTS idx_registrations_team ON player_registrations(team_id);
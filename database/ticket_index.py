@@ -0,0 +1,132 @@
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from database.db import db
+
+@dataclass
+class OpenTicket:
+    channel_id: int
+    guild_id: int
+    creator_id: int
+    category: str
+    created_at: datetime.datetime  # server local time, like the tickets.created_at column
+    claimed_by: Optional[int] = None
+    reminded_24h: bool = False
+    escalated_48h: bool = False
+    claimed_at: Optional[datetime.datetime] = None
+    first_staff_reply_at: Optional[datetime.datetime] = None
+
+OPEN_TICKET_COLUMNS = ("channel_id", "guild_id", "creator_id", "category", "created_at", "claimed_by", "reminded_24h", "escalated_48h", "claimed_at", "first_staff_reply_at")
+
+def ticket_from_row(row: dict) -> OpenTicket:
+    # SQLite and aiomysql both return BOOLEAN columns as 0/1
+    row['reminded_24h'] = bool(row['reminded_24h'])
+    row['escalated_48h'] = bool(row['escalated_48h'])
+    return OpenTicket(**row)
+
+class OpenTicketIndex:
+    """In-memory index of open tickets, by channel and by (creator, category).
+
+    Loaded once at startup; create/claim/close write to the DB and update the index
+    together, so the ticket hot paths (duplicate check, claim, message capture)
+    never query the tickets table.
+    """
+
+    def __init__(self):
+        self.by_channel: dict[int, OpenTicket] = {}
+        self.by_creator: dict[tuple[int, str], int] = {}
+        self.loaded = False
+
+    def _add(self, ticket: OpenTicket):
+        self.by_channel[ticket.channel_id] = ticket
+        self.by_creator[(ticket.creator_id, ticket.category)] = ticket.channel_id
+
+    def _remove(self, channel_id: int) -> Optional[OpenTicket]:
+        ticket = self.by_channel.pop(channel_id, None)
+        if ticket and self.by_creator.get((ticket.creator_id, ticket.category)) == channel_id:
+            del self.by_creator[(ticket.creator_id, ticket.category)]
+        return ticket
+
+    async def load(self):
+        rows = await db.fetchall(f"SELECT {', '.join(OPEN_TICKET_COLUMNS)} FROM tickets WHERE status = 'open'", primary=True)
+        self.by_channel.clear()
+        self.by_creator.clear()
+        for row in rows:
+            self._add(ticket_from_row(row))
+        self.loaded = True
+        logging.info(f"Loaded {len(self.by_channel)} open ticket(s).")
+
+    def is_open(self, channel_id: int) -> bool:
+        return channel_id in self.by_channel
+
+    def values(self):
+        return self.by_channel.values()
+
+    async def get(self, channel_id: int) -> Optional[OpenTicket]:
+        ticket = self.by_channel.get(channel_id)
+        if ticket is None and not self.loaded:
+            # Startup load failed (e.g. DB outage); fall back to reading through
+            row = await db.fetchrow(f"SELECT {', '.join(OPEN_TICKET_COLUMNS)} FROM tickets WHERE channel_id = %s AND status = 'open'", (channel_id,), primary=True)
+            if row:
+                ticket = ticket_from_row(row)
+                self._add(ticket)
+        return ticket
+
+    async def find(self, creator_id: int, category: str) -> Optional[OpenTicket]:
+        channel_id = self.by_creator.get((creator_id, category))
+        if channel_id is None and not self.loaded:
+            row = await db.fetchrow("SELECT channel_id FROM tickets WHERE creator_id = %s AND status = 'open' AND category = %s", (creator_id, category), primary=True)
+            if row:
+                return await self.get(row['channel_id'])
+        return self.by_channel.get(channel_id)
+
+    async def create(self, channel_id: int, guild_id: int, creator_id: int, category: str) -> OpenTicket:
+        # Indexed before the INSERT so messages sent into the channel meanwhile are captured
+        ticket = OpenTicket(channel_id, guild_id, creator_id, category, datetime.datetime.now())
+        self._add(ticket)
+        try:
+            await db.execute(
+                "INSERT INTO tickets (channel_id, guild_id, creator_id, category, status) VALUES (%s, %s, %s, %s, 'open')",
+                (channel_id, guild_id, creator_id, category)
+            )
+        except Exception:
+            self._remove(channel_id)
+            raise
+        return ticket
+
+    async def claim(self, channel_id: int, user_id: int) -> bool:
+        """Claims an unclaimed ticket; False if it is unknown or already claimed."""
+        ticket = await self.get(channel_id)
+        if not ticket or ticket.claimed_by:
+            return False
+        ticket.claimed_by = user_id  # set before awaiting so a concurrent click sees it
+        ticket.claimed_at = datetime.datetime.now()
+        try:
+            await db.execute("UPDATE tickets SET claimed_by = %s, claimed_at = %s WHERE channel_id = %s", (user_id, ticket.claimed_at, channel_id))
+        except Exception:
+            ticket.claimed_by = ticket.claimed_at = None
+            raise
+        return True
+
+    async def record_first_staff_reply(self, channel_id: int) -> Optional[OpenTicket]:
+        """Stamps first_staff_reply_at once; returns the ticket only the first time."""
+        ticket = self.by_channel.get(channel_id)
+        if not ticket or ticket.first_staff_reply_at:
+            return None
+        ticket.first_staff_reply_at = datetime.datetime.now()
+        await db.execute(
+            "UPDATE tickets SET first_staff_reply_at = %s WHERE channel_id = %s",
+            (ticket.first_staff_reply_at, channel_id), queue_on_failure=True
+        )
+        return ticket
+
+    async def close(self, channel_id: int, channel_name: str) -> Optional[OpenTicket]:
+        ticket = self._remove(channel_id)
+        await db.execute(
+            "UPDATE tickets SET status = 'closed', channel_name = %s, closed_at = %s WHERE channel_id = %s",
+            (channel_name, datetime.datetime.now(), channel_id), queue_on_failure=True
+        )
+        return ticket
+
+ticket_index = OpenTicketIndex()
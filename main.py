@@ -3,7 +3,9 @@ from discord.ext import commands
 import os
 import logging
 from dotenv import load_dotenv
-from database.db import db
+from database.db import db, DatabaseUnavailable
+from database.guild_settings import guild_settings
+from database.ticket_index import ticket_index
 from datetime import datetime
 import traceback
 
@@ -20,6 +22,8 @@ class ISFEBot(commands.Bot):
         intents.message_content = True
         intents.reactions = True
         intents.voice_states = True
+        # Ticket auto-assignment only picks online handlers (privileged, enable it in the portal too)
+        intents.presences = os.getenv("TICKET_AUTO_ASSIGN", "false").lower() == "true"
         
         super().__init__(
             command_prefix=["!", "^"],
@@ -32,6 +36,15 @@ class ISFEBot(commands.Bot):
         # Connect Database
         await db.connect()
         await db.initialize_schema() # Ensure tables exist
+        try:
+            await guild_settings.load()
+        except Exception as e:
+            logger.error(f"Failed to load guild settings, reading through until restart: {e}")
+        try:
+            await ticket_index.load()
+        except Exception as e:
+            logger.error(f"Failed to load open tickets, reading through until restart: {e}")
+        self.tree.on_error = self.on_app_command_error
 
         # Load Cogs
         initial_extensions = [
@@ -59,9 +72,28 @@ class ISFEBot(commands.Bot):
         # Note: In production, sync specific guild or global on command, not every startup
         await self.tree.sync() 
 
+    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        original = getattr(error, "original", error)
+        if isinstance(original, DatabaseUnavailable):
+            # DB is reconnecting in the background; tell the user instead of failing silently
+            msg = "⚠️ The database is temporarily unavailable. Please try again in a moment."
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send(msg, ephemeral=True)
+                else:
+                    await interaction.response.send_message(msg, ephemeral=True)
+            except discord.HTTPException:
+                pass
+            return
+
+        command = interaction.command.qualified_name if interaction.command else "unknown"
+        logger.error(f"Ignoring exception in command /{command}: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
     async def close(self):
-        await db.close()
+        # Cogs flush their buffered writes on unload, so close the DB last
         await super().close()
+        await db.close()
 
 bot = ISFEBot()
 
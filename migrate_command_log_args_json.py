@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Convert command_logs.args from Python repr strings to JSON and add indexed generated columns on remote DB.
+
+Old rows hold str(interaction.data['options']); they are parsed with ast.literal_eval and
+rewritten with the same normalisation the bot now uses (cogs.admin_logs.normalize_command_options).
+"""
+import ast
+import asyncio
+import json
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+from cogs.admin_logs import normalize_command_options
+
+load_dotenv()
+
+BATCH_SIZE = 1000
+
+def convert(args):
+    if not args:
+        return "{}"
+    try:
+        json.loads(args)
+        return None  # Already JSON
+    except ValueError:
+        pass
+    try:
+        return json.dumps(normalize_command_options(ast.literal_eval(args)), ensure_ascii=False)
+    except (ValueError, SyntaxError):
+        return json.dumps({"raw": args}, ensure_ascii=False)
+
+async def convert_table(cur, table):
+    last_id, converted = 0, 0
+    while True:
+        await cur.execute(f"SELECT id, args FROM {table} WHERE id > %s ORDER BY id LIMIT %s", (last_id, BATCH_SIZE))
+        rows = await cur.fetchall()
+        if not rows:
+            break
+        updates = [(new, row_id) for row_id, args in rows if (new := convert(args)) is not None]
+        if updates:
+            await cur.executemany(f"UPDATE {table} SET args = %s WHERE id = %s", updates)
+            converted += len(updates)
+        last_id = rows[-1][0]
+    print(f"✅ Converted {converted} rows in {table}")
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+        autocommit=True,
+    )
+    
+    async with conn.cursor() as cur:
+        await convert_table(cur, "command_logs")
+        await convert_table(cur, "command_logs_archive")
+
+        statements = [
+            ("args column type", "ALTER TABLE command_logs MODIFY COLUMN args JSON"),
+            ("arg_team_name column", "ALTER TABLE command_logs ADD COLUMN arg_team_name VARCHAR(100) GENERATED ALWAYS AS (LEFT(JSON_UNQUOTE(JSON_EXTRACT(args, '$.team_name')), 100)) STORED"),
+            ("arg_match_number column", "ALTER TABLE command_logs ADD COLUMN arg_match_number BIGINT GENERATED ALWAYS AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(args, '$.match_number')) = 'INTEGER' THEN CAST(JSON_EXTRACT(args, '$.match_number') AS SIGNED) END) STORED"),
+            ("idx_command_logs_team_name", "CREATE INDEX idx_command_logs_team_name ON command_logs(arg_team_name)"),
+            ("idx_command_logs_match_number", "CREATE INDEX idx_command_logs_match_number ON command_logs(command_name, arg_match_number)"),
+        ]
+        for label, statement in statements:
+            try:
+                await cur.execute(statement)
+                print(f"✅ {label}")
+            except Exception as e:
+                if "Duplicate" in str(e) and "ADD COLUMN" in statement:
+                    # Added by an earlier run with an unbounded expression; re-apply the safe one
+                    await cur.execute(statement.replace("ADD COLUMN", "MODIFY COLUMN"))
+                    print(f"✅ {label} (updated)")
+                elif "Duplicate" in str(e):
+                    print(f"⚠️ {label} already exists")
+                else:
+                    print(f"❌ Error on {label}: {e}")
+    
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Key command_user_hourly by command on remote DB, so /command_stats can show top users per command.
+
+Existing rows are guild-wide totals; they are kept with command_name = '' for hours whose
+raw command_logs rows were already expired, and recomputed per command for the rest.
+"""
+import asyncio
+import datetime
+import os
+from dotenv import load_dotenv
+import aiomysql
+
+load_dotenv()
+
+async def main():
+    conn = await aiomysql.connect(
+        host=os.getenv("REMOTE_DB_HOST"),
+        port=int(os.getenv("REMOTE_DB_PORT", 3306)),
+        user=os.getenv("REMOTE_DB_USER"),
+        password=os.getenv("REMOTE_DB_PASSWORD"),
+        db=os.getenv("REMOTE_DB_NAME"),
+        autocommit=True,
+    )
+
+    async with conn.cursor() as cur:
+        try:
+            await cur.execute(
+                """ALTER TABLE command_user_hourly
+                   ADD COLUMN command_name VARCHAR(100) NOT NULL DEFAULT '' AFTER hour,
+                   DROP PRIMARY KEY, ADD PRIMARY KEY (guild_id, hour, command_name, user_id)"""
+            )
+            print("✅ Added command_user_hourly.command_name")
+        except Exception as e:
+            if "Duplicate" in str(e):
+                print("⚠️ command_user_hourly.command_name already exists")
+            else:
+                print(f"❌ Error altering command_user_hourly: {e}")
+                conn.close()
+                return
+
+        await cur.execute("SELECT MIN(timestamp) FROM command_logs")
+        (first_ts,) = await cur.fetchone()
+        if first_ts is None:
+            print("⚠️ No raw command logs to recompute from")
+        else:
+            # The first hour may be partly expired already; start at the next full one
+            start = first_ts.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+            await cur.execute("DELETE FROM command_user_hourly WHERE command_name = '' AND hour >= %s", (start,))
+            await cur.execute(
+                """INSERT INTO command_user_hourly (guild_id, hour, command_name, user_id, invocations)
+                   SELECT guild_id, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00') AS log_hour, command_name, user_id, COUNT(*)
+                   FROM command_logs WHERE timestamp >= %s AND guild_id IS NOT NULL
+                   GROUP BY guild_id, log_hour, command_name, user_id
+                   ON DUPLICATE KEY UPDATE invocations = VALUES(invocations)""",
+                (start,)
+            )
+            print(f"✅ Recomputed per-command top users from {start}")
+
+    conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Query-plan regression check for every SQL string in the bot.
+
+Seeds an in-memory SQLite copy of the schema with realistic row counts, runs
+EXPLAIN QUERY PLAN on each SELECT/UPDATE/DELETE found in cogs/, utils/ and
+database/, and exits non-zero if any of them falls back to a full table scan or
+can't be EXPLAINed. f-string queries are checked when their placeholders resolve
+from module-level names; the rest are listed as skipped.
+
+    python -m scripts.check_query_plans           # SQLite, seeded (CI)
+    python -m scripts.check_query_plans --mysql   # EXPLAIN against the .env MySQL DB as-is
+
+The --mysql mode does not seed anything; point it at a staging copy with real data.
+"""
+import argparse
+import ast
+import asyncio
+import datetime
+import importlib
+import pathlib
+import random
+import re
+import sys
+
+from database.db import Database, SQLiteBackend, create_backend, translate_mysql_to_sqlite
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SOURCE_DIRS = ["cogs", "utils", "database"]
+
+# Rows per table at "realistic" production scale; anything unlisted gets DEFAULT_ROWS.
+DEFAULT_ROWS = 1_000
+ROW_COUNTS = {
+    "command_logs": 200_000,
+    "tickets": 50_000,
+    "scheduled_embeds": 5_000,
+    "teams": 500,
+    "player_registrations": 5_000,
+    "guild_settings": 20,
+    "autocreate_configs": 20,
+}
+
+# Low-cardinality columns that need realistic values for the planner's statistics.
+COLUMN_VALUES = {
+    ("tickets", "status"): ["closed"] * 19 + ["open"],
+    ("tickets", "category"): ["A", "B", "C", "D"],
+    ("scheduled_embeds", "status"): ["sent"] * 9 + ["pending", "failed"],
+    ("teams", "game_name"): ["MLBB", "CODM"],
+    ("player_registrations", "nickname_preference"): ["this", "other", "combined", "plain"],
+    ("command_logs", "args"): ['{}', '{"team_name": "Team A"}', '{"match_number": 12, "winner": "Team B", "score": "2-1"}'],
+}
+
+# Tables that are small by design and are intentionally read in full (e.g. startup caches).
+ALLOWED_FULL_SCANS = {
+    "autocreate_configs": "loaded once into Voice.config_cache at startup",
+    "teams": "a few hundred rows per season; /entries lists every team",
+    "guild_settings": "one row per guild, loaded once into GuildSettingsCache at startup",
+}
+
+# MySQL mode: only flag type=ALL scans estimated above this many rows
+MYSQL_MIN_ROWS = 1_000
+
+_SQL_START = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b[\s\S]*\b(FROM|SET)\b")
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?(.*)$")
+_FTS_MATCH_RE = re.compile(r"VIRTUAL TABLE INDEX \d+:\S*M")
+_DERIVED_RE = re.compile(r"\)\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+_SQL_KEYWORDS = {"WHERE", "JOIN", "ON", "SET", "GROUP", "ORDER", "LEFT", "INNER", "LIMIT", "AND", "OR", "AS", "THEN", "ELSE", "END", "IN"}
+
+# Queries that only ever run on one backend (full-text search syntax differs)
+BACKEND_ONLY = {
+    "mysql": re.compile(r"\bMATCH\s*\(.*\)\s*AGAINST\b", re.IGNORECASE | re.DOTALL),
+    "sqlite": re.compile(r"\b\w+_fts\b"),
+}
+
+
+def render_fstring(node, namespace):
+    """Evaluates an f-string against module globals; None if a placeholder needs locals."""
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+            continue
+        try:
+            result = eval(compile(ast.Expression(value.value), "<query>", "eval"), dict(namespace))
+        except Exception:
+            return None
+        parts.append(format(result) if value.conversion == -1 else repr(result) if value.conversion == ord("r") else str(result))
+    return "".join(parts)
+
+
+def find_queries():
+    """Yields (location, query) for every SQL string in the source dirs; query is None
+    for f-strings whose placeholders can't be resolved statically."""
+    for folder in SOURCE_DIRS:
+        for path in sorted((ROOT / folder).glob("*.py")):
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+            fstring_parts = {id(v) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for v in node.values}
+            namespace = None
+            for node in ast.walk(tree):
+                location = f"{path.relative_to(ROOT)}:{getattr(node, 'lineno', 0)}"
+                if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in fstring_parts:
+                    if _SQL_START.match(node.value):
+                        yield location, node.value
+                elif isinstance(node, ast.JoinedStr):
+                    shape = "".join(v.value if isinstance(v, ast.Constant) else "{}" for v in node.values)
+                    if not _SQL_START.match(shape):
+                        continue
+                    if namespace is None:
+                        module = ".".join(path.relative_to(ROOT).with_suffix("").parts)
+                        namespace = vars(importlib.import_module(module))
+                    yield location, render_fstring(node, namespace)
+
+
+def synthetic_value(table, column, decl_type, i, rows):
+    if (table, column) in COLUMN_VALUES:
+        values = COLUMN_VALUES[(table, column)]
+        return values[i % len(values)]
+    decl_type = decl_type.upper()
+    if "INT" in decl_type:
+        return random.randint(1, max(rows // 10, 10))
+    if "BOOL" in decl_type:
+        return random.random() < 0.2
+    if "DATETIME" in decl_type:
+        return datetime.datetime.now() - datetime.timedelta(minutes=random.randint(0, 60 * 24 * 180))
+    return f"{column}-{i}"
+
+
+async def seed_sqlite(db):
+    conn = db.backend.conn
+    tables = [r["name"] for r in await db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    # FTS5 tables (and their shadow tables) are rebuilt from their content table instead
+    fts = [r["name"] for r in await db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")]
+    tables = [t for t in tables if not any(t == f or t.startswith(f + "_") for f in fts)]
+    for table in tables:
+        columns = await db.fetchall(f"PRAGMA table_info({table})")
+        columns = [c for c in columns if not (c["pk"] and c["type"].upper() == "INTEGER")]  # rowid aliases
+        rows = ROW_COUNTS.get(table, DEFAULT_ROWS)
+        names = ", ".join(c["name"] for c in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        data = []
+        for i in range(rows):
+            row = []
+            for c in columns:
+                value = synthetic_value(table, c["name"], c["type"], i, rows)
+                if c["pk"] or c["name"] in ("channel_id", "identifier", "message_id", "voice_channel_id", "team_name"):
+                    value = i + 1 if "INT" in c["type"].upper() else f"{c['name']}-{i}"
+                row.append(value)
+            data.append(row)
+        await conn.execute("PRAGMA foreign_keys=OFF")
+        await conn.executemany(f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({placeholders})", data)
+    for table in fts:
+        await conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    await conn.execute("ANALYZE")
+
+
+async def explain_sqlite(db, query):
+    """Returns the tables fully scanned by the query's plan."""
+    sql = translate_mysql_to_sqlite(query)
+    params = (None,) * sql.count("?")
+    plan = await db.backend.conn.execute_fetchall(f"EXPLAIN QUERY PLAN {sql}", params)
+    scans = []
+    for row in plan:
+        detail = row[3]
+        m = _SCAN_RE.match(detail)
+        # "SCAN x USING COVERING INDEX" over a whole index is still O(n), so it counts too.
+        # "SCAN fts VIRTUAL TABLE INDEX 0:M..." is an FTS5 MATCH lookup, not a scan.
+        if m and "CONSTANT ROW" not in detail and not _FTS_MATCH_RE.search(detail):
+            scans.append(m.group(1))
+    return scans
+
+
+async def explain_mysql(db, query):
+    params = (1,) * query.count("%s")
+    scans = []
+    for row in await db.fetchall(f"EXPLAIN {query}", params):
+        if row.get("type") == "ALL" and (row.get("rows") or 0) >= MYSQL_MIN_ROWS:
+            scans.append(row["table"])
+    return scans
+
+
+async def run_checks(db, explain, verbose=False):
+    """EXPLAINs every query; returns (checked, failures, skipped)."""
+    # Skip queries that only ever run on the other backend
+    skip_backend = "mysql" if db.backend.name == "sqlite" else "sqlite"
+    # SQLite reports aliases ("SCAN t"), so resolve them back to table names
+    alias_re = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+
+    failures = 0
+    checked = 0
+    skipped = []
+    for location, query in find_queries():
+        if query is None:
+            skipped.append(location)
+            continue
+        if BACKEND_ONLY[skip_backend].search(query):
+            continue
+        checked += 1
+        aliases = {}
+        for table, alias in alias_re.findall(query):
+            aliases[table] = table
+            if alias and alias.upper() not in _SQL_KEYWORDS:
+                aliases[alias] = table
+        try:
+            scans = await explain(db, query)
+        except Exception as e:
+            failures += 1
+            print(f"❌ {location}: could not EXPLAIN ({e})\n     {' '.join(query.split())}")
+            continue
+        # A derived table "(SELECT ...) hits" is the subquery's (already checked) output
+        derived = {d for d in _DERIVED_RE.findall(query) if d.upper() not in _SQL_KEYWORDS}
+        bad = [aliases.get(s, s) for s in scans if aliases.get(s, s) not in ALLOWED_FULL_SCANS and s not in derived]
+        if verbose:
+            print(f"{location}: scans={[aliases.get(s, s) for s in scans]}")
+        if bad:
+            failures += 1
+            one_line = " ".join(query.split())
+            print(f"❌ {location}: full scan of {', '.join(sorted(set(bad)))}\n     {one_line}")
+    for location in skipped:
+        print(f"⏭️  {location}: skipped, f-string built from local values")
+    return checked, failures, len(skipped)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mysql", action="store_true", help="EXPLAIN against the configured MySQL database")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the scans found for every query")
+    args = parser.parse_args()
+
+    if args.mysql:
+        db = Database(create_backend("mysql"))
+        explain = explain_mysql
+    else:
+        random.seed(1234)
+        db = Database(SQLiteBackend(":memory:"))
+        explain = explain_sqlite
+
+    await db.connect()
+    try:
+        if not args.mysql:
+            await db.initialize_schema()
+            await seed_sqlite(db)
+        checked, failures, skipped = await run_checks(db, explain, args.verbose)
+    finally:
+        await db.close()
+
+    print(f"\nChecked {checked} queries, {failures} failure(s), {skipped} skipped.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
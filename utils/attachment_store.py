@@ -0,0 +1,150 @@
+import asyncio
+import collections
+import hashlib
+import logging
+import os
+import re
+from typing import Optional
+
+# Local archive of ticket attachments (Discord CDN links expire, the archive doesn't)
+ATTACHMENT_STORE_DIR = os.getenv("ATTACHMENT_STORE_DIR", "data/attachments")
+ATTACHMENT_STORE_QUOTA_MB = int(os.getenv("ATTACHMENT_STORE_QUOTA_MB", "2048"))
+ATTACHMENT_MAX_MB = int(os.getenv("ATTACHMENT_MAX_MB", "25"))
+ATTACHMENT_DOWNLOAD_CONCURRENCY = int(os.getenv("ATTACHMENT_DOWNLOAD_CONCURRENCY", "4"))
+# Where the archive directory is served from. When unset, zip transcripts carry the archived
+# files themselves (TRANSCRIPT_FORMAT=zip, the default); gzip/html ones keep the CDN links.
+ATTACHMENT_BASE_URL = os.getenv("ATTACHMENT_BASE_URL", "").rstrip("/")
+
+_EXT_RE = re.compile(r"\.[a-z0-9]{1,10}$")
+
+
+class AttachmentStore:
+    """Content-addressed attachment archive with a size quota and LRU eviction.
+
+    Files live at <root>/<sha256[:2]>/<sha256><ext>, so identical uploads are stored once.
+    Recency is kept in an OrderedDict (oldest first) seeded from file mtimes at startup;
+    storing or re-referencing a file moves it to the end, and the oldest files are
+    deleted once the archive grows past the quota.
+    """
+
+    def __init__(self, root: str = ATTACHMENT_STORE_DIR, quota_bytes: int = ATTACHMENT_STORE_QUOTA_MB * 1024 * 1024,
+                 max_file_bytes: int = ATTACHMENT_MAX_MB * 1024 * 1024, concurrency: int = ATTACHMENT_DOWNLOAD_CONCURRENCY):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.max_file_bytes = max_file_bytes
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.entries = collections.OrderedDict()  # key -> size, least recently used first
+        self.by_digest = {}  # sha256 -> key
+        self.total_bytes = 0
+        self.stats = {"downloaded": 0, "deduplicated": 0, "evicted": 0, "skipped": 0, "failed": 0}
+
+    def _scan(self):
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                found.append((st.st_mtime, os.path.relpath(path, self.root).replace(os.sep, "/"), st.st_size))
+        return sorted(found)
+
+    async def load(self):
+        """Rebuilds the LRU index from the files on disk."""
+        os.makedirs(self.root, exist_ok=True)
+        self.entries.clear()
+        self.by_digest.clear()
+        self.total_bytes = 0
+        for _, key, size in await asyncio.to_thread(self._scan):
+            self.entries[key] = size
+            self.by_digest[key.split("/")[-1].split(".")[0]] = key
+            self.total_bytes += size
+        logging.info(f"📎 Attachment store: {len(self.entries)} files, {self.total_bytes / (1024 * 1024):.1f} MiB")
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def touch(self, key: str):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _evict(self, keep: Optional[str] = None):
+        while self.total_bytes > self.quota_bytes and self.entries:
+            key, size = next(iter(self.entries.items()))
+            if key == keep:
+                break
+            del self.entries[key]
+            self.by_digest.pop(key.split("/")[-1].split(".")[0], None)
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    async def archive(self, attachment) -> Optional[str]:
+        """Downloads one discord.Attachment into the store and returns its key (None if skipped)."""
+        if attachment.size > min(self.max_file_bytes, self.quota_bytes):
+            self.stats["skipped"] += 1
+            return None
+        try:
+            async with self.semaphore:
+                data = await attachment.read()
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.warning(f"⚠️ Could not download attachment {attachment.filename}: {e}")
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        key = self.by_digest.get(digest)
+        if key in self.entries:
+            self.stats["deduplicated"] += 1
+            self.touch(key)
+            return key
+
+        ext = _EXT_RE.search(attachment.filename.lower())
+        key = f"{digest[:2]}/{digest}{ext.group(0) if ext else ''}"
+        await asyncio.to_thread(self._write, key, data)
+        if key in self.entries:  # same file finished downloading concurrently
+            self.stats["deduplicated"] += 1
+            self.touch(key)
+            return key
+        self.entries[key] = len(data)
+        self.by_digest[digest] = key
+        self.total_bytes += len(data)
+        self.stats["downloaded"] += 1
+        self._evict(keep=key)
+        return key
+
+    async def archive_many(self, attachments) -> list[Optional[str]]:
+        """Archives attachments concurrently (bounded by the download semaphore)."""
+        return list(await asyncio.gather(*(self.archive(a) for a in attachments)))
+
+    def resolve(self, entry) -> tuple:
+        """Maps a stored [filename, url, content_type, key?] entry to the (filename, url, content_type, local_path)
+        the transcript should use, preferring the archived copy while it is still on disk: served from
+        ATTACHMENT_BASE_URL when set, otherwise local_path lets the packager bundle the file."""
+        filename, url, content_type, *rest = entry
+        key = rest[0] if rest else None
+        if key and key in self.entries:
+            self.touch(key)
+            if ATTACHMENT_BASE_URL:
+                return (filename, f"{ATTACHMENT_BASE_URL}/{key}", content_type, None)
+            return (filename, url, content_type, os.path.abspath(self._path(key)))
+        return (filename, url, content_type, None)
+
+
+attachment_store = AttachmentStore()
@@ -0,0 +1,344 @@
+import asyncio
+import concurrent.futures
+import datetime
+import functools
+import gzip
+import html
+import logging
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import BinaryIO, NamedTuple, Optional, Sequence
+
+from utils.constants import TZ_MANILA
+
+# Messages rendered per write() to the output file
+RENDER_BATCH = 256
+# Transcripts smaller than this stay in memory, larger ones spill to a temp file on disk
+TRANSCRIPT_SPOOL_BYTES = int(os.getenv("TRANSCRIPT_SPOOL_BYTES", str(8 * 1024 * 1024)))
+# Off-loop rendering: "process" (default) or "thread" pool, worker count and pending-job bound
+TRANSCRIPT_EXECUTOR = os.getenv("TRANSCRIPT_EXECUTOR", "process").lower()
+TRANSCRIPT_WORKERS = int(os.getenv("TRANSCRIPT_WORKERS", "2"))
+TRANSCRIPT_QUEUE_SIZE = int(os.getenv("TRANSCRIPT_QUEUE_SIZE", "8"))
+# Upload packaging: "zip" (default), "gzip" or "html" (uncompressed)
+TRANSCRIPT_FORMAT = os.getenv("TRANSCRIPT_FORMAT", "zip").lower()
+# Headroom kept below the guild upload limit for the multipart request itself
+UPLOAD_HEADROOM = 64 * 1024
+# Share of each zip part that archived attachments may fill (the rest is for the HTML)
+ATTACHMENT_BUNDLE_SHARE = 0.5
+
+DEFAULT_AVATAR = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class TranscriptMessage(NamedTuple):
+    """Plain, discord-independent record of one ticket message."""
+    author_name: str
+    avatar_url: str
+    is_bot: bool
+    content: str
+    attachments: tuple  # ((filename, url, content_type[, local_path]), ...), see AttachmentStore.resolve
+    created_at: float  # UTC epoch seconds
+
+    @classmethod
+    def from_message(cls, msg):
+        return cls(
+            author_name=msg.author.display_name,
+            avatar_url=msg.author.display_avatar.url if msg.author.display_avatar else DEFAULT_AVATAR,
+            is_bot=msg.author.bot,
+            content=msg.content or "",
+            attachments=tuple((a.filename, a.url, a.content_type) for a in msg.attachments),
+            created_at=msg.created_at.timestamp()
+        )
+
+
+# --- Precompiled patterns & templates ---
+MENTION_RE = re.compile(r'&lt;@!?(\d+)&gt;')
+MENTION_SUB = r'<span class="mention">@\1</span>'
+
+STYLE = """
+    <style>
+        body { font-family: 'gg sans', 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #313338; color: #dbdee1; margin: 0; padding: 20px; }
+        .header { border-bottom: 1px solid #3f4147; padding-bottom: 10px; margin-bottom: 20px; }
+        .header h1 { color: #f2f3f5; margin: 0; font-size: 20px; }
+        .chat-container { display: block; width: 100%; }
+        .message-group { display: flex; margin-bottom: 16px; align-items: flex-start; width: 100%; }
+        .avatar { width: 40px; height: 40px; border-radius: 50%; margin-right: 16px; flex-shrink: 0; background-color: #2b2d31; background-size: cover; }
+        .content { flex: 1; }
+        .meta { display: flex; align-items: baseline; margin-bottom: 4px; }
+        .username { font-weight: 500; color: #f2f3f5; margin-right: 8px; font-size: 16px; }
+        .bot-tag { background-color: #5865f2; color: #fff; font-size: 10px; padding: 1px 4px; border-radius: 3px; vertical-align: middle; margin-left: 4px; }
+        .timestamp { font-size: 12px; color: #949ba4; }
+        .text { font-size: 16px; line-height: 1.375rem; white-space: pre-wrap; word-wrap: break-word; color: #dbdee1; }
+        .text strong { font-weight: 700; color: #f2f3f5; }
+        .text .mention { background-color: #3c4270; color: #c9cdfb; padding: 0 2px; border-radius: 3px; cursor: pointer; font-weight: 500;}
+        .attachment img { max-width: 400px; max-height: 300px; border-radius: 4px; }
+        a { color: #00a8fc; text-decoration: none; }
+    </style>
+    """
+
+HEADER_TEMPLATE = """
+    <!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Transcript - {channel_name}</title>{style}<style>{avatars}</style></head><body>
+         <div class="header"><h1>#{channel_name}</h1><p>Transcript generated on {generated} (PHT)</p></div>
+         <div class="chat-container">
+    """
+
+MESSAGE_TEMPLATE = """
+            <div class="message-group">
+                <div class="avatar av{avatar}"></div>
+                <div class="content">
+                    <div class="meta"><span class="username">{username}</span><span class="timestamp">{ts}</span></div>
+                    <div class="text">{content}</div>
+                    {attachments}
+                </div>
+            </div>"""
+
+IMAGE_TEMPLATE = '<div class="attachment"><a href="{url}" target="_blank"><img src="{url}"></a></div>'
+FILE_TEMPLATE = '<div class="attachment"><a href="{url}" target="_blank">📄 {filename}</a></div>'
+
+AVATAR_CLASS_TEMPLATE = '.av{index} {{ background-image: url("{url}"); }}\n'
+
+FOOTER = "</div></body></html>"
+
+
+@functools.lru_cache(maxsize=4096)
+def format_minute(minute: int) -> str:
+    # Timestamps only show minutes, so consecutive messages share one strftime
+    return datetime.datetime.fromtimestamp(minute * 60, TZ_MANILA).strftime('%m/%d/%Y %I:%M %p')
+
+
+def avatar_classes(messages: Sequence[TranscriptMessage]) -> dict[str, int]:
+    """Maps each distinct avatar URL to a CSS class index, so a URL is written once per transcript."""
+    classes = {}
+    for msg in messages:
+        classes.setdefault(msg.avatar_url or DEFAULT_AVATAR, len(classes))
+    return classes
+
+
+def attachment_links(msg: TranscriptMessage, bundled: Optional[dict[str, str]]):
+    """(filename, url, content_type) per attachment, pointing at the copy inside the zip when bundled."""
+    for filename, url, content_type, *local in msg.attachments:
+        yield filename, bundled.get(local[0], url) if bundled and local and local[0] else url, content_type
+
+
+def render_message(msg: TranscriptMessage, avatars: dict[str, int], bundled: Optional[dict[str, str]] = None) -> str:
+    attachments = "".join(
+        IMAGE_TEMPLATE.format(url=url) if content_type and content_type.startswith('image/')
+        else FILE_TEMPLATE.format(url=url, filename=html.escape(filename))
+        for filename, url, content_type in attachment_links(msg, bundled)
+    )
+    content = html.escape(msg.content or "")
+    if "&lt;@" in content:
+        content = MENTION_RE.sub(MENTION_SUB, content)
+    return MESSAGE_TEMPLATE.format(
+        avatar=avatars[msg.avatar_url or DEFAULT_AVATAR],
+        username=html.escape(msg.author_name),
+        ts=format_minute(int(msg.created_at) // 60),
+        content=content,
+        attachments=attachments
+    )
+
+
+def render_transcript(messages: Sequence[TranscriptMessage], channel_name: str, out: BinaryIO, bundled: Optional[dict[str, str]] = None):
+    """Streams the HTML transcript into a binary file object, RENDER_BATCH messages per write.
+    bundled maps local attachment paths to their relative path inside the package."""
+    avatars = avatar_classes(messages)
+    out.write(HEADER_TEMPLATE.format(
+        channel_name=channel_name, style=STYLE,
+        avatars="".join(AVATAR_CLASS_TEMPLATE.format(index=i, url=url.replace('"', "%22")) for url, i in avatars.items()),
+        generated=datetime.datetime.now(TZ_MANILA).strftime('%Y-%m-%d %H:%M:%S')
+    ).encode())
+    batch = []
+    for msg in messages:
+        try:
+            batch.append(render_message(msg, avatars, bundled))
+        except Exception:
+            continue
+        if len(batch) >= RENDER_BATCH:
+            out.write("".join(batch).encode())
+            batch.clear()
+    batch.append(FOOTER)
+    out.write("".join(batch).encode())
+
+
+def generate_html_transcript(messages: Sequence[TranscriptMessage], channel_name: str) -> BinaryIO:
+    """Renders a transcript into a spooled temp file (rewound, ready for discord.File)."""
+    out = tempfile.SpooledTemporaryFile(max_size=TRANSCRIPT_SPOOL_BYTES)
+    render_transcript(messages, channel_name, out)
+    out.seek(0)
+    return out
+
+
+class TranscriptPackage(NamedTuple):
+    """What a worker hands back: finished upload files plus numbers for the size report."""
+    files: list  # [(path, upload filename), ...], caller deletes the paths
+    messages: int
+    html_bytes: int
+    packed_bytes: int
+    format: str
+
+
+def select_bundle(messages: Sequence[TranscriptMessage], budget: int) -> dict[str, str]:
+    """Picks archived attachment files to ship inside a zip, in message order, up to budget bytes.
+    Files that don't fit keep their original link."""
+    bundled, total = {}, 0
+    for msg in messages:
+        for _, _, _, *local in msg.attachments:
+            path = local[0] if local else None
+            if not path or path in bundled:
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue  # evicted from the store since the transcript was loaded
+            if total + size <= budget:
+                bundled[path] = f"attachments/{os.path.basename(path)}"
+                total += size
+    return bundled
+
+
+def pack_file(html_path: str, fmt: str, inner_name: str, bundled: Optional[dict[str, str]] = None) -> str:
+    """Compresses a rendered HTML file (plus any bundled attachments, zip only) and returns the new path."""
+    if fmt == "html":
+        return html_path
+    suffix = ".zip" if fmt == "zip" else ".html.gz"
+    fd, path = tempfile.mkstemp(prefix="transcript-", suffix=suffix)
+    os.close(fd)
+    if fmt == "zip":
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            zf.write(html_path, arcname=inner_name)
+            for source, arcname in (bundled or {}).items():
+                try:
+                    # Mostly images/video that are already compressed
+                    zf.write(source, arcname=arcname, compress_type=zipfile.ZIP_STORED)
+                except OSError as e:
+                    logging.warning(f"Could not bundle attachment {source}: {e}")
+    else:
+        with open(html_path, "rb") as src, gzip.open(path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+    os.remove(html_path)
+    return path
+
+
+def render_part(messages: Sequence[TranscriptMessage], title: str, fmt: str, inner_name: str, bundle_budget: int = 0):
+    bundled = select_bundle(messages, bundle_budget) if fmt == "zip" else {}
+    fd, html_path = tempfile.mkstemp(prefix="transcript-", suffix=".html")
+    with os.fdopen(fd, "wb") as out:
+        render_transcript(messages, title, out, bundled)
+    html_bytes = os.path.getsize(html_path)
+    return pack_file(html_path, fmt, inner_name, bundled), html_bytes
+
+
+def package_transcript(messages: Sequence[TranscriptMessage], channel_name: str, upload_limit: int, fmt: str = TRANSCRIPT_FORMAT) -> TranscriptPackage:
+    """Worker entry point: renders and packages a transcript, splitting it into
+    self-contained parts (by message count) until every file fits under upload_limit.
+    zip parts also carry the archived attachments their messages reference."""
+    fmt = fmt if fmt in ("zip", "gzip", "html") else "zip"
+    ext = {"zip": "zip", "gzip": "html.gz", "html": "html"}[fmt]
+    limit = max(upload_limit - UPLOAD_HEADROOM, 1)
+    parts = 1
+    while True:
+        size = math.ceil(len(messages) / parts) or 1
+        chunks = [messages[i:i + size] for i in range(0, len(messages), size)] or [messages]
+        files, html_bytes = [], 0
+        for n, chunk in enumerate(chunks, 1):
+            label = f"-part{n}of{len(chunks)}" if len(chunks) > 1 else ""
+            title = f"{channel_name} (part {n}/{len(chunks)})" if len(chunks) > 1 else channel_name
+            path, part_html = render_part(chunk, title, fmt, f"transcript-{channel_name}{label}.html", int(limit * ATTACHMENT_BUNDLE_SHARE))
+            files.append((path, f"transcript-{channel_name}{label}.{ext}"))
+            html_bytes += part_html
+
+        largest = max(os.path.getsize(path) for path, _ in files)
+        if largest <= limit or len(chunks) >= len(messages):
+            return TranscriptPackage(files, len(messages), html_bytes, sum(os.path.getsize(p) for p, _ in files), fmt)
+
+        for path, _ in files:
+            os.remove(path)
+        # Grow the split proportionally to the overshoot (with 10% slack) rather than one part at a time
+        parts = max(len(chunks) + 1, math.ceil(len(chunks) * largest / limit * 1.1))
+
+
+def format_size(num_bytes: int) -> str:
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KiB"
+    return f"{num_bytes / (1024 * 1024):.1f} MiB"
+
+
+def size_report(package: TranscriptPackage) -> str:
+    """One-line summary for the Ticket Closed embed."""
+    report = f"{package.messages} messages · {format_size(package.html_bytes)} HTML"
+    if package.format != "html":
+        report += f" → {format_size(package.packed_bytes)} {package.format}"
+    if len(package.files) > 1:
+        report += f" in {len(package.files)} parts"
+    return report
+
+
+class TranscriptRenderer:
+    """Renders transcripts in a worker pool so large tickets never block the event loop.
+
+    Jobs go through a bounded asyncio.Queue: when TRANSCRIPT_QUEUE_SIZE jobs are already
+    waiting, render() waits for room instead of piling more work onto the pool.
+    """
+
+    def __init__(self, kind: str = TRANSCRIPT_EXECUTOR, workers: int = TRANSCRIPT_WORKERS, queue_size: int = TRANSCRIPT_QUEUE_SIZE):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.executor = None
+        self.queue = None
+        self.tasks = []
+
+    def start(self):
+        if self.kind == "thread":
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transcript")
+        else:
+            # spawn: don't fork a process that holds the bot's sockets and DB threads
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logging.info(f"🧾 Transcript renderer started ({self.kind} pool, {self.workers} workers)")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.executor:
+            # Join the pool off-loop; a non-waiting shutdown leaves process workers to be reaped at interpreter exit
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self.queue.get()
+            try:
+                if not future.cancelled():
+                    result = await loop.run_in_executor(self.executor, func, *args)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _submit(self, func, *args):
+        if not self.executor:
+            raise RuntimeError("TranscriptRenderer is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((func, args, future))
+        return await future
+
+    async def render(self, messages: list[TranscriptMessage], channel_name: str, upload_limit: int) -> TranscriptPackage:
+        """Renders and packages off the event loop; the caller uploads and deletes package.files."""
+        return await self._submit(package_transcript, list(messages), channel_name, upload_limit)